@@ -9,6 +9,7 @@ Usage:
   import pyperclip
   pyperclip.copy('The text to be copied to the clipboard.')
   spam = pyperclip.paste()
+  start, truncated = pyperclip.paste(max_bytes=1024)
 
   if not pyperclip.is_available():
     print("Copy functionality unavailable!")
@@ -37,21 +38,36 @@ Security Note: This module runs programs with these names:
     - wl-copy/wl-paste
     - klipper
     - qdbus
+    - tmux
 A malicious user could rename or add programs with these names, tricking
 Pyperclip into running them with whatever permissions the Python process has.
 
 """
 __version__ = '1.11.0'
 
+import atexit
 import base64
+import codecs
+import collections
+import concurrent.futures
 import contextlib
 import ctypes
+import ctypes.util
+import functools
+import hashlib
+import importlib.util
+import json
 import os
 import platform
+import queue
+import re
+import select
 import subprocess
 import sys
+import threading
 import time
 import warnings
+import zlib
 
 from ctypes import c_size_t, sizeof, c_wchar_p, get_errno, c_wchar
 from typing import Union, Optional
@@ -71,8 +87,12 @@ ENCODING = 'utf-8'  # type: str
 try:
     # Use shutil.which() for Python 3+
     from shutil import which
+    _which_cache = {}  # Maps (name, $PATH) to whether the program was found.
     def _py3_executable_exists(name):  # type: (str) -> bool
-        return bool(which(name))
+        key = (name, os.environ.get('PATH'))
+        if key not in _which_cache:
+            _which_cache[key] = bool(which(name))
+        return _which_cache[key]
     _executable_exists = _py3_executable_exists
 except ImportError:
     # Use the "which" unix command for Python 2.7 and prior.
@@ -94,6 +114,78 @@ class PyperclipTimeoutException(PyperclipException):
     pass
 
 
+# Helpers for paste(max_bytes=...), which returns a (text, truncated) tuple:
+def _decode_prefix(data, truncated):  # type: (bytes, bool) -> str
+    if not truncated:
+        return data.decode(ENCODING)
+    # An incremental decoder drops a multi-byte character cut off at the end.
+    return codecs.getincrementaldecoder(ENCODING)().decode(data)
+
+
+def _read_limited(p, max_bytes, raw=False, timeout=None):
+    '''
+    Reads at most max_bytes from the stdout of the Popen object p, killing
+    the process if it has more to write. Returns a (text, truncated) tuple,
+    or a (bytes, truncated) tuple if raw is True. If timeout is given, kills
+    the process and raises PyperclipTimeoutException if it takes longer than
+    that many seconds.
+    '''
+    if timeout is None:
+        data = p.stdout.read(max_bytes + 1)
+    else:
+        deadline = time.time() + timeout
+        fd = p.stdout.fileno()
+        chunks = []
+        size = 0
+        while size <= max_bytes:
+            remaining = deadline - time.time()
+            if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+                p.kill()
+                p.communicate()
+                raise PyperclipTimeoutException('%s timed out after %s seconds.' % (p.args[0], timeout))
+            chunk = os.read(fd, max_bytes + 1 - size)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            size += len(chunk)
+        data = b''.join(chunks)
+    truncated = len(data) > max_bytes
+    if truncated:
+        p.kill()
+    if truncated or timeout is None:
+        p.communicate()
+    else:
+        _communicate(p, None, max(0, deadline - time.time()))
+    if raw:
+        return data[:max_bytes], truncated
+    return _decode_prefix(data[:max_bytes], truncated), truncated
+
+
+def _communicate(p, input, timeout):
+    '''
+    Like p.communicate(input), but kills the process and raises
+    PyperclipTimeoutException if it takes longer than timeout seconds.
+    '''
+    try:
+        return p.communicate(input=input, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        p.kill()
+        p.communicate()
+        raise PyperclipTimeoutException('%s timed out after %s seconds.' % (p.args[0], timeout))
+
+
+def _truncate(text, max_bytes):
+    '''
+    Truncates text that has already been pasted in full, for clipboard
+    mechanisms that can't stop reading early. Returns a (text, truncated) tuple.
+    '''
+    if max_bytes is None:
+        return text
+    data = text.encode(ENCODING)
+    truncated = len(data) > max_bytes
+    return _decode_prefix(data[:max_bytes], truncated), truncated
+
+
 def init_osx_pbcopy_clipboard():
     def copy_osx_pbcopy(text):
         text = _PYTHON_STR_TYPE(text) # Converts non-str values to str.
@@ -101,16 +193,27 @@ def init_osx_pbcopy_clipboard():
                              stdin=subprocess.PIPE, close_fds=True)
         p.communicate(input=text.encode(ENCODING))
 
-    def paste_osx_pbcopy():
+    def copy_fd_osx_pbcopy(fd):
+        p = subprocess.Popen(['pbcopy', 'w'], stdin=fd, close_fds=True)
+        p.wait()
+
+    def paste_osx_pbcopy(max_bytes=None):
         p = subprocess.Popen(['pbpaste', 'r'],
                              stdout=subprocess.PIPE, close_fds=True)
+        if max_bytes is not None:
+            return _read_limited(p, max_bytes)
         stdout, stderr = p.communicate()
         return stdout.decode(ENCODING)
 
+    copy_osx_pbcopy.copy_fd = copy_fd_osx_pbcopy
     return copy_osx_pbcopy, paste_osx_pbcopy
 
 
 def init_osx_pyobjc_clipboard():
+    global Foundation, AppKit
+    import Foundation
+    import AppKit
+
     def copy_osx_pyobjc(text):
         '''Copy string argument to clipboard'''
         text = _PYTHON_STR_TYPE(text) # Converts non-str values to str.
@@ -120,10 +223,12 @@ def init_osx_pyobjc_clipboard():
         board.declareTypes_owner_([AppKit.NSStringPboardType], None)
         board.setData_forType_(newData, AppKit.NSStringPboardType)
 
-    def paste_osx_pyobjc():
+    def paste_osx_pyobjc(max_bytes=None):
         "Returns contents of clipboard"
         board = AppKit.NSPasteboard.generalPasteboard()
         content = board.stringForType_(AppKit.NSStringPboardType)
+        if max_bytes is not None:
+            return _truncate(_PYTHON_STR_TYPE(content or ''), max_bytes)
         return content
 
     return copy_osx_pyobjc, paste_osx_pyobjc
@@ -136,102 +241,285 @@ def init_qt_clipboard():
     # Try to import from qtpy, but if that fails try PyQt5
     try:
         from qtpy.QtWidgets import QApplication
+        from qtpy.QtCore import QObject, QThread, QTimer, Signal, Slot
     except:
         from PyQt5.QtWidgets import QApplication
+        from PyQt5.QtCore import QObject, QThread, QTimer, pyqtSignal as Signal, pyqtSlot as Slot
+
+    class Invoker(QObject):
+        # Emitting `invoke` from any thread runs the job on the thread that
+        # owns this object, by way of that thread's event loop.
+        invoke = Signal(object)
+
+        def __init__(self):
+            super(Invoker, self).__init__()
+            self.invoke.connect(self.run)
+
+        @Slot(object)
+        def run(self, job):
+            job()
+
+    if QApplication.instance() is None:
+        # Nothing owns a QApplication yet, so start a GUI thread that creates
+        # one and runs its event loop. Copy/paste requests are queued to it.
+        started = threading.Event()
+        gui = {}
+
+        def run_gui_thread():
+            try:
+                gui['app'] = QApplication([])
+                gui['invoker'] = Invoker()
+            except BaseException as exc:
+                gui['error'] = exc
+                started.set()
+                return
+            # Signals readiness from inside the event loop, so that no job
+            # runs anywhere but on this thread.
+            QTimer.singleShot(0, started.set)
+            # PyQt6 renamed exec_() to exec().
+            run_event_loop = getattr(gui['app'], 'exec_', None) or gui['app'].exec
+            run_event_loop()
+            # The application must be destroyed on the thread that created it.
+            del gui['app']
+
+        thread = threading.Thread(target=run_gui_thread, name='pyperclip-qt')
+        thread.daemon = True
+        thread.start()
+        started.wait()
+        if 'error' in gui:
+            raise gui['error']
+        invoker = gui['invoker']
+
+        def stop_gui_thread():
+            invoker.invoke.emit(QApplication.quit)
+            thread.join(1)
+        atexit.register(stop_gui_thread)
+
+        def run_directly():
+            if not thread.is_alive():
+                raise PyperclipException('The Qt clipboard\'s GUI thread has stopped.')
+            return QThread.currentThread() == invoker.thread()
+    else:
+        # Use the existing application's thread, which runs its event loop.
+        invoker = Invoker()
+        invoker.moveToThread(QApplication.instance().thread())
+
+        def run_directly():
+            # If the application's event loop isn't running (yet), nothing
+            # would ever run a queued job, so the clipboard is called
+            # directly, as pyperclip always used to.
+            return QThread.currentThread() == invoker.thread() or invoker.thread().loopLevel() == 0
+
+    def submit(func):
+        future = concurrent.futures.Future()
+
+        def job():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(func())
+            except BaseException as exc:
+                future.set_exception(exc)
+
+        if run_directly():
+            job()
+        else:
+            invoker.invoke.emit(job)
+        return future
+
+    def submit_copy_qt(text):
+        text = _PYTHON_STR_TYPE(text) # Converts non-str values to str.
+        return submit(lambda: QApplication.clipboard().setText(text))
 
-    app = QApplication.instance()
-    if app is None:
-        app = QApplication([])
+    def submit_paste_qt(max_bytes=None):
+        return submit(lambda: _truncate(_PYTHON_STR_TYPE(QApplication.clipboard().text()), max_bytes))
 
     def copy_qt(text):
-        text = _PYTHON_STR_TYPE(text) # Converts non-str values to str.
-        cb = app.clipboard()
-        cb.setText(text)
+        submit_copy_qt(text).result()
 
-    def paste_qt():
-        cb = app.clipboard()
-        return _PYTHON_STR_TYPE(cb.text())
+    def paste_qt(max_bytes=None):
+        return submit_paste_qt(max_bytes).result()
 
+    # submit() returns a concurrent.futures.Future instead of waiting:
+    copy_qt.submit = submit_copy_qt
+    paste_qt.submit = submit_paste_qt
     return copy_qt, paste_qt
 
 
-def init_xclip_clipboard():
+def init_xclip_clipboard(display=None, timeout=None, owner=False):
+    # display is an X11 display name such as ':1', defaulting to $DISPLAY.
+    # If timeout is given, calls raise PyperclipTimeoutException when xclip
+    # takes longer than that many seconds. If owner is True, copies are
+    # served by one reusable in-process owner (see _X11Owner) instead of
+    # each leaving an xclip process behind. Copies it can't serve (with a
+    # format, or too large) use an xclip process that helper_count() tracks.
     DEFAULT_SELECTION='c'
     PRIMARY_SELECTION='p'
 
-    def copy_xclip(text, primary=False):
-        text = _PYTHON_STR_TYPE(text) # Converts non-str values to str.
+    def xclip_args(primary):
+        args = ['xclip']
+        if display is not None:
+            args += ['-display', display]
         selection=DEFAULT_SELECTION
         if primary:
             selection=PRIMARY_SELECTION
-        p = subprocess.Popen(['xclip', '-selection', selection],
+        return args + ['-selection', selection]
+
+    def copy_xclip(text, primary=False, format=None):
+        # With a format (an X11 target), text must be bytes in that format.
+        if format is None:
+            text = _PYTHON_STR_TYPE(text).encode(ENCODING) # Converts non-str values to str.
+            if owner and _x11_owner(display).copy(text, primary, timeout):
+                return
+        args = xclip_args(primary)
+        if format is not None:
+            args += ['-t', format]
+        if owner:
+            _start_x11_helper(args + ['-quiet'], display, primary, timeout, input=text)
+            return
+        p = subprocess.Popen(args,
                              stdin=subprocess.PIPE, close_fds=True)
-        p.communicate(input=text.encode(ENCODING))
-
-    def paste_xclip(primary=False):
-        selection=DEFAULT_SELECTION
-        if primary:
-            selection=PRIMARY_SELECTION
-        p = subprocess.Popen(['xclip', '-selection', selection, '-o'],
+        _communicate(p, text, timeout)
+
+    def copy_fd_xclip(fd, primary=False):
+        if owner:
+            _start_x11_helper(xclip_args(primary) + ['-quiet'], display, primary, timeout, stdin=fd)
+            return
+        p = subprocess.Popen(xclip_args(primary),
+                             stdin=fd, close_fds=True)
+        _communicate(p, None, timeout)
+
+    def paste_xclip(primary=False, max_bytes=None, format=None):
+        if owner and format is None:
+            owned = _owned_text(display, primary, timeout)
+            if owned is not None:
+                return _truncate(owned, max_bytes)
+        args = xclip_args(primary)
+        if format is not None:
+            args += ['-t', format]
+        p = subprocess.Popen(args + ['-o'],
                              stdout=subprocess.PIPE,
                              stderr=subprocess.PIPE,
                              close_fds=True)
-        stdout, stderr = p.communicate()
+        if max_bytes is not None:
+            return _read_limited(p, max_bytes, raw=format is not None, timeout=timeout)
+        stdout, stderr = _communicate(p, None, timeout)
         # Intentionally ignore extraneous output on stderr when clipboard is empty
+        if format is not None:
+            return stdout
         return stdout.decode(ENCODING)
 
+    def available_formats_xclip(primary=False):
+        # The TARGETS target lists the targets the selection owner offers.
+        return [target for target in paste_xclip(primary, format='TARGETS').decode(ENCODING).splitlines()
+                if target]
+
+    copy_xclip.copy_fd = copy_fd_xclip
+    paste_xclip.available_formats = available_formats_xclip
+    paste_xclip.watch_changes = functools.partial(_watch_x11_selection, display=display)
     return copy_xclip, paste_xclip
 
 
-def init_xsel_clipboard():
+def init_xsel_clipboard(display=None, timeout=None, owner=False):
+    # display, timeout, and owner work as they do for init_xclip_clipboard().
     DEFAULT_SELECTION='-b'
     PRIMARY_SELECTION='-p'
 
-    def copy_xsel(text, primary=False):
-        text = _PYTHON_STR_TYPE(text) # Converts non-str values to str.
+    def xsel_args(primary):
+        args = ['xsel']
+        if display is not None:
+            args += ['--display', display]
         selection_flag = DEFAULT_SELECTION
         if primary:
             selection_flag = PRIMARY_SELECTION
-        p = subprocess.Popen(['xsel', selection_flag, '-i'],
-                             stdin=subprocess.PIPE, close_fds=True)
-        p.communicate(input=text.encode(ENCODING))
+        return args + [selection_flag]
 
-    def paste_xsel(primary=False):
-        selection_flag = DEFAULT_SELECTION
-        if primary:
-            selection_flag = PRIMARY_SELECTION
-        p = subprocess.Popen(['xsel', selection_flag, '-o'],
+    def copy_xsel(text, primary=False):
+        text = _PYTHON_STR_TYPE(text) # Converts non-str values to str.
+        if owner:
+            if not _x11_owner(display).copy(text.encode(ENCODING), primary, timeout):
+                _start_x11_helper(xsel_args(primary) + ['-i', '--nodetach'], display, primary, timeout,
+                                  input=text.encode(ENCODING))
+            return
+        p = subprocess.Popen(xsel_args(primary) + ['-i'],
+                             stdin=subprocess.PIPE, close_fds=True)
+        _communicate(p, text.encode(ENCODING), timeout)
+
+    def copy_fd_xsel(fd, primary=False):
+        if owner:
+            _start_x11_helper(xsel_args(primary) + ['-i', '--nodetach'], display, primary, timeout, stdin=fd)
+            return
+        p = subprocess.Popen(xsel_args(primary) + ['-i'],
+                             stdin=fd, close_fds=True)
+        _communicate(p, None, timeout)
+
+    def paste_xsel(primary=False, max_bytes=None):
+        if owner:
+            owned = _owned_text(display, primary, timeout)
+            if owned is not None:
+                return _truncate(owned, max_bytes)
+        p = subprocess.Popen(xsel_args(primary) + ['-o'],
                              stdout=subprocess.PIPE, close_fds=True)
-        stdout, stderr = p.communicate()
+        if max_bytes is not None:
+            return _read_limited(p, max_bytes, timeout=timeout)
+        stdout, stderr = _communicate(p, None, timeout)
         return stdout.decode(ENCODING)
 
+    copy_xsel.copy_fd = copy_fd_xsel
+    paste_xsel.watch_changes = functools.partial(_watch_x11_selection, display=display)
     return copy_xsel, paste_xsel
 
 
 def init_wl_clipboard():
     PRIMARY_SELECTION = "-p"
 
-    def copy_wl(text, primary=False):
-        text = _PYTHON_STR_TYPE(text)  # Converts non-str values to str.
+    def copy_wl(text, primary=False, format=None):
+        # With a format (a MIME type), text must be bytes in that format.
+        if format is None:
+            text = _PYTHON_STR_TYPE(text).encode(ENCODING)  # Converts non-str values to str.
         args = ["wl-copy"]
         if primary:
             args.append(PRIMARY_SELECTION)
+        if format is not None:
+            args += ["-t", format]
         if not text:
             args.append('--clear')
             subprocess.check_call(args, close_fds=True)
         else:
             pass
             p = subprocess.Popen(args, stdin=subprocess.PIPE, close_fds=True)
-            p.communicate(input=text.encode(ENCODING))
+            p.communicate(input=text)
+
+    def copy_fd_wl(fd, primary=False):
+        args = ["wl-copy"]
+        if primary:
+            args.append(PRIMARY_SELECTION)
+        p = subprocess.Popen(args, stdin=fd, close_fds=True)
+        p.wait()
 
-    def paste_wl(primary=False):
-        args = ["wl-paste", "-n", "-t", "text"]
+    def paste_wl(primary=False, max_bytes=None, format=None):
+        args = ["wl-paste", "-n", "-t", format or "text"]
         if primary:
             args.append(PRIMARY_SELECTION)
         p = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE, close_fds=True)
+        if max_bytes is not None:
+            return _read_limited(p, max_bytes, raw=format is not None)
         stdout, _stderr = p.communicate()
+        if format is not None:
+            return stdout
         return stdout.decode(ENCODING)
 
+    def available_formats_wl(primary=False):
+        args = ["wl-paste", "--list-types"]
+        if primary:
+            args.append(PRIMARY_SELECTION)
+        p = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE, close_fds=True)
+        stdout, _stderr = p.communicate()
+        return [mime_type for mime_type in stdout.decode(ENCODING).splitlines() if mime_type]
+
+    copy_wl.copy_fd = copy_fd_wl
+    paste_wl.available_formats = available_formats_wl
+    paste_wl.watch_changes = _watch_wayland_selection
     return copy_wl, paste_wl
 
 
@@ -244,7 +532,7 @@ def init_klipper_clipboard():
             stdin=subprocess.PIPE, close_fds=True)
         p.communicate(input=None)
 
-    def paste_klipper():
+    def paste_klipper(max_bytes=None):
         p = subprocess.Popen(
             ['qdbus', 'org.kde.klipper', '/klipper', 'getClipboardContents'],
             stdout=subprocess.PIPE, close_fds=True)
@@ -259,28 +547,175 @@ def init_klipper_clipboard():
         assert clipboardContents.endswith('\n')
         if clipboardContents.endswith('\n'):
             clipboardContents = clipboardContents[:-1]
-        return clipboardContents
+        return _truncate(clipboardContents, max_bytes)
 
     return copy_klipper, paste_klipper
 
 
-def init_dev_clipboard_clipboard():
+def init_tmux_clipboard():
+    # Uses the tmux server that $TMUX points to. tmux's paste buffer is
+    # also forwarded to the terminal's clipboard if tmux's set-clipboard
+    # option is on.
+    def copy_tmux(text):
+        text = _PYTHON_STR_TYPE(text) # Converts non-str values to str.
+        p = subprocess.Popen(['tmux', 'load-buffer', '-'],
+                             stdin=subprocess.PIPE, close_fds=True)
+        p.communicate(input=text.encode(ENCODING))
+
+    def copy_fd_tmux(fd):
+        p = subprocess.Popen(['tmux', 'load-buffer', '-'], stdin=fd, close_fds=True)
+        p.wait()
+
+    def paste_tmux(max_bytes=None):
+        p = subprocess.Popen(['tmux', 'save-buffer', '-'],
+                             stdout=subprocess.PIPE,
+                             stderr=subprocess.PIPE,
+                             close_fds=True)
+        if max_bytes is not None:
+            return _read_limited(p, max_bytes)
+        stdout, stderr = p.communicate()
+        # Intentionally ignore the "no buffers" error when the buffer is empty
+        return stdout.decode(ENCODING)
+
+    copy_tmux.copy_fd = copy_fd_tmux
+    return copy_tmux, paste_tmux
+
+
+def init_osc52_clipboard(tty_path='/dev/tty', timeout=1.0):
+    # OSC 52 is a terminal escape sequence that sets (or, if the terminal
+    # allows it, reports) the clipboard of the machine the terminal runs on,
+    # so it works over SSH without a display.
+    import termios
+    import tty
+
+    # GNU screen drops DCS strings longer than 768 bytes, so the sequence is
+    # split into chunks that are each wrapped in their own DCS string.
+    SCREEN_CHUNK_SIZE = 76
+    RESPONSE_RE = re.compile(br'\x1b\]52;[a-z]*;([A-Za-z0-9+/=]*)(?:\x07|\x1b\\)')
+
+    def wrap_for_multiplexer(sequence):
+        if os.getenv('TMUX'):
+            # tmux passes DCS "tmux;" strings through with ESCs doubled.
+            return b'\x1bPtmux;' + sequence.replace(b'\x1b', b'\x1b\x1b') + b'\x1b\\'
+        if os.getenv('STY'):
+            return b''.join(b'\x1bP' + sequence[i:i + SCREEN_CHUNK_SIZE] + b'\x1b\\'
+                            for i in range(0, len(sequence), SCREEN_CHUNK_SIZE))
+        return sequence
+
+    def write_all(fd, data):
+        while data:
+            data = data[os.write(fd, data):]
+
+    def copy_osc52(text, primary=False):
+        text = _PYTHON_STR_TYPE(text) # Converts non-str values to str.
+        selection = b'p' if primary else b'c'
+        sequence = b'\x1b]52;' + selection + b';' + base64.b64encode(text.encode(ENCODING)) + b'\x07'
+        fd = os.open(tty_path, os.O_WRONLY | os.O_NOCTTY)
+        try:
+            write_all(fd, wrap_for_multiplexer(sequence))
+        finally:
+            os.close(fd)
+
+    def paste_osc52(primary=False, max_bytes=None):
+        selection = b'p' if primary else b'c'
+        fd = os.open(tty_path, os.O_RDWR | os.O_NOCTTY)
+        old_attrs = termios.tcgetattr(fd)
+        try:
+            tty.setraw(fd)
+            write_all(fd, wrap_for_multiplexer(b'\x1b]52;' + selection + b';?\x07'))
+            response = b''
+            deadline = time.time() + timeout
+            while True:
+                remaining = deadline - time.time()
+                if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+                    raise PyperclipTimeoutException('The terminal did not answer the OSC 52 clipboard query. Many terminals only allow setting the clipboard.')
+                response += os.read(fd, 65536)
+                match = RESPONSE_RE.search(response)
+                if match:
+                    break
+        finally:
+            termios.tcsetattr(fd, termios.TCSAFLUSH, old_attrs)
+            os.close(fd)
+        return _truncate(base64.b64decode(match.group(1)).decode(ENCODING), max_bytes)
+
+    return copy_osc52, paste_osc52
+
+
+def _has_controlling_tty():  # type: () -> bool
+    try:
+        fd = os.open('/dev/tty', os.O_RDWR | os.O_NOCTTY)
+    except OSError:
+        return False
+    os.close(fd)
+    return True
+
+
+@contextlib.contextmanager
+def _borrowed(fo):
+    # Like contextlib.nullcontext(fo), which needs Python 3.7: fo isn't closed.
+    yield fo
+
+
+def init_dev_clipboard_clipboard(path='/dev/clipboard', chunk_size=65536):
+    # Besides Cygwin's /dev/clipboard, path can be any device-like file, FIFO,
+    # or regular file. A regular file is opened once and rewritten in place
+    # on every call. Anything else is reopened for each call, since devices
+    # such as /dev/clipboard only take new contents when they're closed.
+    lock = threading.Lock()
+    reusable = {}  # Holds the open file object, once a regular file is opened.
+
+    def open_file(mode):
+        # Returns None if pasting from a path that doesn't exist, which is
+        # only created by copying.
+        if 'file' not in reusable:
+            exists = os.path.exists(path)
+            if exists and not os.path.isfile(path):
+                return open(path, mode)
+            if not exists and mode == 'rb':
+                return None
+            reusable['file'] = open(path, 'r+b' if exists else 'w+b')
+            atexit.register(reusable['file'].close)
+        return _borrowed(reusable['file'])
+
     def copy_dev_clipboard(text):
         text = _PYTHON_STR_TYPE(text) # Converts non-str values to str.
-        if text == '':
+        if text == '' and path == '/dev/clipboard':
             warnings.warn('Pyperclip cannot copy a blank string to the clipboard on Cygwin. This is effectively a no-op.')
-        if '\r' in text:
+        if '\r' in text and path == '/dev/clipboard':
             warnings.warn('Pyperclip cannot handle \\r characters on Cygwin.')
 
-        fo = open('/dev/clipboard', 'wt')
-        fo.write(text)
-        fo.close()
-
-    def paste_dev_clipboard():
-        fo = open('/dev/clipboard', 'rt')
-        content = fo.read()
-        fo.close()
-        return content
+        data = memoryview(text.encode(ENCODING))
+        with lock:
+            with open_file('wb') as fo:
+                if fo.seekable():
+                    fo.seek(0)
+                    fo.truncate()
+                for i in range(0, len(data), chunk_size):
+                    fo.write(data[i:i + chunk_size])
+                fo.flush()
+
+    def paste_dev_clipboard(max_bytes=None):
+        limit = None if max_bytes is None else max_bytes + 1
+        chunks = []
+        size = 0
+        with lock:
+            file_context = open_file('rb')
+            if file_context is None:
+                return _truncate(u'', max_bytes)
+            with file_context as fo:
+                if fo.seekable():
+                    fo.seek(0)
+                while limit is None or size < limit:
+                    chunk = fo.read(chunk_size if limit is None else min(chunk_size, limit - size))
+                    if not chunk:
+                        break
+                    chunks.append(chunk)
+                    size += len(chunk)
+        data = b''.join(chunks)
+        if max_bytes is None:
+            return data.decode(ENCODING)
+        truncated = len(data) > max_bytes
+        return _decode_prefix(data[:max_bytes], truncated), truncated
 
     return copy_dev_clipboard, paste_dev_clipboard
 
@@ -445,7 +880,7 @@ def init_windows_clipboard():
                     safeGlobalUnlock(handle)
                     safeSetClipboardData(CF_UNICODETEXT, handle)
 
-    def paste_windows():
+    def paste_windows(max_bytes=None):
         with clipboard(None):
             handle = safeGetClipboardData(CF_UNICODETEXT)
             if not handle:
@@ -453,11 +888,11 @@ def init_windows_clipboard():
                 # if the clipboard is empty.
                 # (Also, it may return a handle to an empty buffer,
                 # but technically that's not empty)
-                return ""
+                return _truncate("", max_bytes)
             locked_handle = safeGlobalLock(handle)
             return_value = c_wchar_p(locked_handle).value
             safeGlobalUnlock(handle)
-            return return_value
+            return _truncate(return_value, max_bytes)
 
     return copy_windows, paste_windows
 
@@ -470,7 +905,7 @@ def init_wsl_clipboard():
                              stdin=subprocess.PIPE, close_fds=True)
         p.communicate(input=text.encode('utf-16le'))
 
-    def paste_wsl():
+    def paste_wsl(max_bytes=None):
         ps_script = '[Convert]::ToBase64String([Text.Encoding]::UTF8.GetBytes((Get-Clipboard -Raw)))'
 
         # '-noprofile' speeds up load time
@@ -486,83 +921,319 @@ def init_wsl_clipboard():
         try:
             base64_encoded = stdout.decode('utf-8').strip()
             decoded_bytes = base64.b64decode(base64_encoded)
-            return decoded_bytes.decode('utf-8')
+            text = decoded_bytes.decode('utf-8')
         except Exception as e:
             raise RuntimeError(f"Decoding error: {e}")
+        return _truncate(text, max_bytes)
 
     return copy_wsl, paste_wsl
 
 
-# Automatic detection of clipboard mechanisms and importing is done in determine_clipboard():
-def determine_clipboard():
+# Clipboard mechanisms are registered as backends. A backend's probe is a
+# cheap check that returns True if the mechanism looks usable here, without
+# importing anything. cost is roughly how expensive the probe is (0 for
+# environment and platform checks, 1 for reading a small file, 2 for
+# searching $PATH or opening the tty, 3 for searching sys.path), and priority
+# is how preferred the mechanism is when several are usable. Backends with no
+# probe are never chosen automatically, only by set_clipboard().
+_Backend = collections.namedtuple('_Backend', 'name init probe cost priority')
+_backends = {}  # type: dict
+_entry_points_loaded = False
+
+
+def register_backend(name, init, probe=None, cost=0, priority=0):
     '''
-    Determine the OS/platform and set the copy() and paste() functions
-    accordingly.
+    Registers a clipboard mechanism under name, replacing any registered with
+    the same name, so that set_clipboard(name) can select it and
+    determine_clipboard() can choose it. init is called with no arguments
+    only once the mechanism is chosen, and returns (copy, paste) functions.
+    probe, cost, and priority are described above _Backend.
+
+    Third-party packages can also register backends through the
+    'pyperclip.backends' entry point group. Each entry point's name is the
+    backend's name and it refers to the init function, which can have probe,
+    cost, and priority attributes. Entry point modules are imported when
+    pyperclip first looks for a clipboard mechanism, so they should leave any
+    heavy imports to the init function.
     '''
+    _backends[name] = _Backend(name, init, probe, cost, priority)
+
+
+def _load_entry_points():
+    global _entry_points_loaded
+    if _entry_points_loaded:
+        return
+    _entry_points_loaded = True
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:
+        return  # Python 3.7 and earlier.
+
+    try:
+        found = entry_points(group='pyperclip.backends')
+    except TypeError:
+        found = entry_points().get('pyperclip.backends', [])  # Python 3.9 and earlier.
+    for entry_point in found:
+        try:
+            init = entry_point.load()
+        except Exception as exc:
+            warnings.warn('Could not load the %r clipboard backend: %s' % (entry_point.name, exc))
+            continue
+        register_backend(entry_point.name, init, getattr(init, 'probe', None),
+                         getattr(init, 'cost', 0), getattr(init, 'priority', 0))
+
+
+def _find_module(name):  # type: (str) -> bool
+    '''Returns True if the named module is installed, without importing it.'''
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
 
-    global Foundation, AppKit, qtpy, PyQt5
+def _is_cygwin():  # type: () -> bool
+    # Cygwin has a variety of values returned by platform.system(), such as 'CYGWIN_NT-6.1'
+    return 'cygwin' in platform.system().lower()
 
-    # Setup for the CYGWIN platform:
-    if 'cygwin' in platform.system().lower(): # Cygwin has a variety of values returned by platform.system(), such as 'CYGWIN_NT-6.1'
-        # FIXME: pyperclip currently does not support Cygwin,
-        # see https://github.com/asweigart/pyperclip/issues/55
-        if os.path.exists('/dev/clipboard'):
-            warnings.warn('Pyperclip\'s support for Cygwin is not perfect, see https://github.com/asweigart/pyperclip/issues/55')
-            return init_dev_clipboard_clipboard()
 
-    # Setup for the WINDOWS platform:
-    elif os.name == 'nt' or platform.system() == 'Windows':
-        return init_windows_clipboard()
+def _probe_dev_clipboard():
+    # FIXME: pyperclip currently does not support Cygwin,
+    # see https://github.com/asweigart/pyperclip/issues/55
+    if _is_cygwin() and os.path.exists('/dev/clipboard'):
+        warnings.warn('Pyperclip\'s support for Cygwin is not perfect, see https://github.com/asweigart/pyperclip/issues/55')
+        return True
+    return False
 
+
+def _probe_windows():
+    return not _is_cygwin() and (os.name == 'nt' or platform.system() == 'Windows')
+
+
+def _probe_wsl():
     if platform.system() == 'Linux' and os.path.isfile('/proc/version'):
         with open('/proc/version', 'r') as f:
-            if "microsoft" in f.read().lower():
-                return init_wsl_clipboard()
+            return "microsoft" in f.read().lower()
+    return False
 
-    # Setup for the MAC OS X platform:
-    if os.name == 'mac' or platform.system() == 'Darwin':
-        try:
-            import Foundation  # check if pyobjc is installed
-            import AppKit
-        except ImportError:
-            return init_osx_pbcopy_clipboard()
-        else:
-            return init_osx_pyobjc_clipboard()
 
-    # Setup for the LINUX platform:
+def _is_mac():  # type: () -> bool
+    return os.name == 'mac' or platform.system() == 'Darwin'
 
-    if os.getenv("WAYLAND_DISPLAY") and _executable_exists("wl-copy")  and _executable_exists("wl-paste"):
-        return init_wl_clipboard()
 
+def _probe_qt():
     # `import PyQt4` sys.exit()s if DISPLAY is not in the environment.
     # Thus, we need to detect the presence of $DISPLAY manually
     # and not load PyQt4 if it is absent.
-    elif os.getenv("DISPLAY"):
-        if _executable_exists("xclip"):
-            # Note: 2024/06/18 Google Trends shows xclip as more popular than xsel.
-            return init_xclip_clipboard()
-        if _executable_exists("xsel"):
-            return init_xsel_clipboard()
-        if _executable_exists("klipper") and _executable_exists("qdbus"):
-            return init_klipper_clipboard()
+    # qtpy is a small abstraction layer that lets you write
+    # applications using a single api call to either PyQt or PySide.
+    # https://pypi.python.org/pypi/QtPy
+    return bool(os.getenv("DISPLAY")) and (_find_module('qtpy') or _find_module('PyQt5'))
+
+
+register_backend('dev-clipboard', init_dev_clipboard_clipboard, _probe_dev_clipboard, 0, 120)
+register_backend('windows', init_windows_clipboard, _probe_windows, 0, 110)
+register_backend('wsl', init_wsl_clipboard, _probe_wsl, 1, 100)
+register_backend('pyobjc', init_osx_pyobjc_clipboard,
+                 lambda: _is_mac() and _find_module('Foundation') and _find_module('AppKit'), 3, 90)
+register_backend('pbcopy', init_osx_pbcopy_clipboard, _is_mac, 0, 80)
+register_backend('wl-clipboard', init_wl_clipboard,
+                 lambda: bool(os.getenv("WAYLAND_DISPLAY")) and _executable_exists("wl-copy") and _executable_exists("wl-paste"), 2, 70)
+# Note: 2024/06/18 Google Trends shows xclip as more popular than xsel.
+register_backend('xclip', init_xclip_clipboard, lambda: bool(os.getenv("DISPLAY")) and _executable_exists("xclip"), 2, 60)
+register_backend('xsel', init_xsel_clipboard, lambda: bool(os.getenv("DISPLAY")) and _executable_exists("xsel"), 2, 50)
+register_backend('xclip-owner', functools.partial(init_xclip_clipboard, owner=True))
+register_backend('xsel-owner', functools.partial(init_xsel_clipboard, owner=True))
+register_backend('klipper', init_klipper_clipboard,
+                 lambda: bool(os.getenv("DISPLAY")) and _executable_exists("klipper") and _executable_exists("qdbus"), 2, 40)
+register_backend('qt', init_qt_clipboard, _probe_qt, 3, 30)  # TODO - split this into 'qtpy' and 'pyqt5'
+# Setup for terminal sessions without a display, such as over SSH:
+register_backend('tmux', init_tmux_clipboard, lambda: bool(os.getenv("TMUX")) and _executable_exists("tmux"), 2, 20)
+register_backend('osc52', init_osc52_clipboard,
+                 lambda: os.getenv("TERM", "dumb") != "dumb" and _has_controlling_tty(), 2, 10)
+
+
+def _clipboard_candidates():
+    '''
+    Yields (name, init_function) pairs for every clipboard mechanism that looks
+    usable on this system, most preferred first. This probes every backend;
+    determine_clipboard() uses _choose_backend(), which probes fewer.
+    '''
+    _load_entry_points()
+    for backend in sorted(_backends.values(), key=lambda backend: -backend.priority):
+        if backend.probe is not None and backend.probe():
+            yield backend.name, backend.init
 
-        try:
-            # qtpy is a small abstraction layer that lets you write
-            # applications using a single api call to either PyQt or PySide.
-            # https://pypi.python.org/pypi/QtPy
-            import qtpy  # check if qtpy is installed
-            return init_qt_clipboard()
-        except ImportError:
-            pass
 
-        # If qtpy isn't installed, fall back on importing PyQt5
+def _choose_backend():
+    '''
+    Returns the most preferred usable backend, or None. Probes run cheapest
+    first, and a backend's probe is skipped once a usable backend with a
+    higher priority has been found, so expensive probes (such as searching
+    for Qt) only run when nothing cheaper and better is usable.
+    '''
+    _load_entry_points()
+    best = None
+    for backend in sorted(_backends.values(), key=lambda backend: (backend.cost, -backend.priority)):
+        if backend.probe is None or (best is not None and backend.priority <= best.priority):
+            continue
+        if backend.probe():
+            best = backend
+    return best
+
+
+def determine_clipboard():
+    '''
+    Determine the OS/platform and set the copy() and paste() functions
+    accordingly.
+    '''
+    backend = _choose_backend()
+    if backend is None:
+        return init_no_clipboard()
+    return backend.init()
+
+
+class _Breaker(object):
+    '''
+    The circuit breaker for one clipboard mechanism in a failover chain. After
+    max_failures consecutive errors or timeouts the mechanism is skipped for
+    recovery_interval seconds, after which the next call probes it again.
+    '''
+
+    def __init__(self, name, init_func):
+        self.name = name
+        self.init_func = init_func
+        self.functions = None  # The (copy, paste) pair, once initialized.
+        self.failures = 0  # Consecutive errors and timeouts.
+        self.open_until = 0.0  # The mechanism is skipped until this time.
+
+    @property
+    def demoted(self):  # type: () -> bool
+        return time.time() < self.open_until
+
+
+def _call_with_timeout(func, timeout, *args, **kwargs):
+    '''
+    Calls func on a separate thread and returns its result, or raises
+    PyperclipTimeoutException if it takes longer than timeout seconds. A call
+    that times out is abandoned, not stopped.
+    '''
+    outcome = {}
+
+    def run():
         try:
-            import PyQt5  # check if PyQt5 is installed
-            return init_qt_clipboard()
-        except ImportError:
-            pass
+            outcome['result'] = func(*args, **kwargs)
+        except BaseException as exc:
+            outcome['error'] = exc
+
+    thread = threading.Thread(target=run, name='pyperclip-failover')
+    thread.daemon = True
+    thread.start()
+    thread.join(timeout)
+    if thread.is_alive():
+        raise PyperclipTimeoutException('Timed out after ' + str(timeout) + ' seconds.')
+    if 'error' in outcome:
+        raise outcome['error']
+    return outcome['result']
+
+
+def init_failover_clipboard(candidates=None, timeout=2.0, max_failures=3, recovery_interval=30.0):
+    '''
+    Returns copy and paste functions that try a chain of clipboard mechanisms
+    in order, moving on to the next one when a mechanism raises an exception
+    or takes longer than timeout seconds. Each mechanism has a circuit
+    breaker, so one that keeps failing is demoted instead of making every call
+    wait for it again (see _Breaker).
+
+    candidates is a list of (name, init_function) pairs, and defaults to every
+    mechanism determine_clipboard() considers usable, in the same order.
+    '''
+    if candidates is None:
+        candidates = list(_clipboard_candidates())
+    breakers = [_Breaker(name, init_func) for name, init_func in candidates]
+
+    def call(index, *args, **kwargs):
+        errors = []
+        for breaker in breakers:
+            if breaker.demoted:
+                continue
+            try:
+                if breaker.functions is None:
+                    breaker.functions = _call_with_timeout(breaker.init_func, timeout)
+                result = _call_with_timeout(breaker.functions[index], timeout, *args, **kwargs)
+            except Exception as exc:
+                breaker.failures += 1
+                if breaker.failures >= max_failures:
+                    breaker.open_until = time.time() + recovery_interval
+                errors.append('%s: %s' % (breaker.name, exc))
+                continue
+            breaker.failures = 0
+            breaker.open_until = 0.0
+            return result
+        if not errors:
+            errors.append('no clipboard mechanism is available')
+        raise PyperclipException('Every clipboard mechanism failed (' + '; '.join(errors) + ')')
+
+    def copy_failover(text, *args, **kwargs):
+        return call(0, text, *args, **kwargs)
+
+    def paste_failover(*args, **kwargs):
+        return call(1, *args, **kwargs)
+
+    copy_failover.breakers = breakers
+    return copy_failover, paste_failover
+
+
+register_backend('failover', init_failover_clipboard)
+register_backend('no', init_no_clipboard)
+
+
+# Hooks let other parts of pyperclip (such as History) see every call made
+# through copy() and paste(). Each hook is called as
+# hook(op, call, *args, **kwargs), where op is 'copy' or 'paste', and must
+# return call(*args, **kwargs).
+_hooks = []
+
+
+def _wrap_with_hooks(op, func):
+    if not _hooks or not func:
+        # ClipboardUnavailable is left unwrapped so that it stays falsey.
+        return func
+
+    call = func
+    for hook in reversed(_hooks):
+        call = functools.partial(hook, op, call)
+
+    @functools.wraps(func)
+    def hooked(*args, **kwargs):
+        return call(*args, **kwargs)
+    hooked._unhooked = func
+    return hooked
+
+
+def _bind_clipboard(copy_func, paste_func):
+    '''
+    Sets pyperclip's copy() and paste() functions to the given clipboard
+    mechanism's functions, wrapped with any registered hooks.
+    '''
+    global copy, paste
+    copy = _wrap_with_hooks('copy', getattr(copy_func, '_unhooked', copy_func))
+    paste = _wrap_with_hooks('paste', getattr(paste_func, '_unhooked', paste_func))
+
 
-    return init_no_clipboard()
+def _add_hook(hook):
+    # Holding the lock keeps a concurrent _ensure_clipboard() from binding
+    # the hooks as they were before this one was added.
+    with _clipboard_lock:
+        _hooks.append(hook)
+        if is_available():
+            _bind_clipboard(copy, paste)
+
+
+def _remove_hook(hook):
+    with _clipboard_lock:
+        _hooks.remove(hook)
+        if is_available():
+            _bind_clipboard(copy, paste)
 
 
 def set_clipboard(clipboard):
@@ -575,29 +1246,94 @@ def set_clipboard(clipboard):
         - qt
         - xclip
         - xsel
+        - xclip-owner, xsel-owner (xclip or xsel, but copies are served in-process, see _X11Owner)
+        - wl-clipboard
         - klipper
+        - wsl
+        - tmux
+        - osc52
+        - dev-clipboard (Cygwin's /dev/clipboard)
         - windows (default on Windows)
+        - failover (tries each usable mechanism in turn, see init_failover_clipboard())
         - no (this is what is set when no clipboard mechanism can be found)
+    or the name of a backend added with register_backend().
     '''
-    global copy, paste
-
-    clipboard_types = {
-        "pbcopy": init_osx_pbcopy_clipboard,
-        "pyobjc": init_osx_pyobjc_clipboard,
-        "qt": init_qt_clipboard,  # TODO - split this into 'qtpy' and 'pyqt5'
-        "xclip": init_xclip_clipboard,
-        "xsel": init_xsel_clipboard,
-        "wl-clipboard": init_wl_clipboard,
-        "klipper": init_klipper_clipboard,
-        "windows": init_windows_clipboard,
-        "no": init_no_clipboard,
-    }
-
-    if clipboard not in clipboard_types:
-        raise ValueError('Argument must be one of %s' % (', '.join([repr(_) for _ in clipboard_types.keys()])))
+    _load_entry_points()
+    if clipboard not in _backends:
+        raise ValueError('Argument must be one of %s' % (', '.join([repr(_) for _ in _backends.keys()])))
 
     # Sets pyperclip's copy() and paste() functions:
-    copy, paste = clipboard_types[clipboard]()
+    start = time.time()
+    with _clipboard_lock:
+        _bind_clipboard(*_backends[clipboard].init())
+    if _tracer is not None:
+        _tracer.record('set_clipboard', start, time.time() - start, backend=clipboard)
+
+
+# Held while a clipboard mechanism is being chosen and initialized, so that
+# concurrent first calls (or a call made during warmup()) wait for one
+# determine_clipboard() call instead of each running their own.
+_clipboard_lock = threading.Lock()
+
+
+def paste_many(displays, max_workers=None, timeout=5.0, primary=False):
+    '''
+    Pastes the clipboard of each X11 display in displays (such as ':1' or
+    'host:0') concurrently, using xclip or xsel on a pool of max_workers
+    threads. Returns a dict mapping each display to its text, or to the
+    exception raised while pasting it, such as PyperclipTimeoutException if
+    that display took longer than timeout seconds.
+
+    $DISPLAY is neither used nor changed.
+    '''
+    if _executable_exists('xclip'):
+        init_func = init_xclip_clipboard
+    elif _executable_exists('xsel'):
+        init_func = init_xsel_clipboard
+    else:
+        raise PyperclipException('paste_many() requires xclip or xsel.')
+
+    def paste_display(display):
+        copy_func, paste_func = init_func(display=display, timeout=timeout)
+        return paste_func(primary=primary)
+
+    results = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = dict((executor.submit(paste_display, display), display) for display in displays)
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                results[futures[future]] = future.result()
+            except Exception as exc:
+                results[futures[future]] = exc
+    return results
+
+
+def _ensure_clipboard():
+    '''Runs determine_clipboard() if copy() and paste() are still the lazy stubs.'''
+    if not is_available():
+        with _clipboard_lock:
+            if not is_available():
+                _bind_clipboard(*determine_clipboard())
+
+
+def warmup(background=True):
+    '''
+    Chooses and initializes a clipboard mechanism ahead of the first copy()
+    or paste() call, so that the first call doesn't pay for detection and
+    initialization (such as creating a QApplication for the Qt mechanism).
+
+    If background is True, this is done on a daemon thread and the thread is
+    returned right away. copy() and paste() calls made before it finishes
+    wait for it rather than starting their own detection. Does nothing if a
+    clipboard mechanism has already been chosen.
+    '''
+    if not background:
+        _ensure_clipboard()
+        return None
+    thread = threading.Thread(target=_ensure_clipboard, name='pyperclip-warmup')
+    thread.daemon = True
+    thread.start()
+    return thread
 
 
 def lazy_load_stub_copy(text):
@@ -617,12 +1353,11 @@ def lazy_load_stub_copy(text):
     will fall back on whatever clipboard mechanism that determine_clipboard()
     automatically chooses.
     '''
-    global copy, paste
-    copy, paste = determine_clipboard()
+    _ensure_clipboard()
     return copy(text)
 
 
-def lazy_load_stub_paste():
+def lazy_load_stub_paste(*args, **kwargs):
     '''
     A stub function for paste(), which will load the real paste() function when
     called so that the real paste() function is used for later calls.
@@ -639,9 +1374,1206 @@ def lazy_load_stub_paste():
     will fall back on whatever clipboard mechanism that determine_clipboard()
     automatically chooses.
     '''
-    global copy, paste
-    copy, paste = determine_clipboard()
-    return paste()
+    _ensure_clipboard()
+    return paste(*args, **kwargs)
+
+
+def available_formats(*args, **kwargs):
+    '''
+    Returns a list of the formats (MIME types on Wayland, targets on X11) that
+    the clipboard's current contents are offered in, without fetching the
+    contents themselves. Pass one of these to paste(format=...) to get the
+    contents in that format as bytes.
+
+    Only the xclip and wl-clipboard mechanisms support formats. Other
+    mechanisms raise PyperclipException.
+    '''
+    _ensure_clipboard()
+    list_formats = getattr(paste, 'available_formats', None)
+    if list_formats is None:
+        raise PyperclipException('The current clipboard mechanism does not support clipboard formats.')
+    return list_formats(*args, **kwargs)
+
+
+# X11 targets and MIME types that hold plain text:
+_TEXT_FORMATS = ('UTF8_STRING', 'STRING', 'TEXT', 'COMPOUND_TEXT', 'text/plain')
+
+
+def _is_text_format(format):  # type: (str) -> bool
+    return format in _TEXT_FORMATS or format.startswith('text/plain;')
+
+
+def _take_snapshot(paste_func):
+    '''
+    Returns a (data, format) pair holding the clipboard's contents: the bytes
+    of its first non-text MIME type (such as image/png) and that MIME type if
+    it offers one, otherwise its text and None.
+    '''
+    list_formats = getattr(paste_func, 'available_formats', None)
+    if list_formats is not None:
+        for format in list_formats():
+            # Skips text types, and X11 targets such as TARGETS and TIMESTAMP.
+            if '/' in format and not format.startswith('text/'):
+                return paste_func(format=format), format
+    return paste_func(), None
+
+
+@contextlib.contextmanager
+def preserved():
+    '''
+    A context manager that puts the clipboard's original contents back when
+    the with block exits:
+
+        with pyperclip.preserved():
+            pyperclip.copy('temporary')
+            ...
+
+    The contents are captured on entry, so they're restored however they
+    were replaced: by copy(), copy_file(), copy_async() (which is flushed
+    first), or another application. If change_count() shows that the
+    clipboard hasn't changed, nothing is copied back.
+
+    Only one format is restored. With the xclip and wl-clipboard mechanisms,
+    contents offered in a non-text MIME type, such as an image/png offered
+    along with text/plain, are restored in the first such type, and the text
+    is lost. Otherwise, only text is restored.
+    '''
+    _ensure_clipboard()
+    raw_copy = getattr(copy, '_unhooked', copy)
+    raw_paste = getattr(paste, '_unhooked', paste)
+    # The token is taken first, so a change made while the snapshot is taken
+    # still counts as a change.
+    token = change_count()
+    data, format = _take_snapshot(raw_paste)
+    try:
+        yield
+    finally:
+        try:
+            flush()  # A copy_async() call from the block mustn't land after the restore.
+        finally:
+            if changed_since(token):
+                if format is None:
+                    raw_copy(data)
+                else:
+                    raw_copy(data, format=format)
+
+
+def paste_prefix(n):  # type: (int) -> str
+    '''
+    Returns the text at the start of the clipboard, at most n bytes long when
+    encoded with ENCODING. Clipboard mechanisms that run a command-line
+    program stop it after n bytes, so this is cheap even if the clipboard
+    holds a huge amount of text.
+
+    To also learn whether the clipboard held more than that, call
+    paste(max_bytes=n), which returns a (text, truncated) tuple.
+    '''
+    text, _truncated = paste(max_bytes=n)
+    return text
+
+
+def copy_file(path_or_fd):
+    '''
+    Copies the contents of a file to the clipboard. The path_or_fd argument
+    can be a filename or an open file descriptor, and the file's contents
+    must already be encoded with ENCODING.
+
+    Clipboard mechanisms that run a command-line program (pbcopy, xclip,
+    xsel, and wl-copy) are handed the file descriptor as their stdin, so the
+    file's contents are never read into Python. Other clipboard mechanisms
+    read and decode the file before passing it to copy(). So does every
+    mechanism while a History is attached or PYPERCLIP_TRACE is set, since
+    these see the copied text.
+    '''
+    _ensure_clipboard()
+
+    close_fd = not isinstance(path_or_fd, int)
+    if close_fd:
+        fd = os.open(path_or_fd, os.O_RDONLY)
+    else:
+        fd = path_or_fd
+
+    try:
+        # Going through copy() runs the hooks, which need the text.
+        copy_fd = None if _hooks else getattr(copy, 'copy_fd', None)
+        if copy_fd is not None:
+            copy_fd(fd)
+        else:
+            chunks = []
+            while True:
+                chunk = os.read(fd, 65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+            copy(b''.join(chunks).decode(ENCODING))
+    finally:
+        if close_fd:
+            os.close(fd)
+
+
+class _AsyncCopier(object):
+    '''
+    Runs copy() on a background thread. Only the most recently submitted text
+    is copied; text that is replaced before the thread gets to it is dropped.
+    '''
+    _NOTHING = object()
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._pending = self._NOTHING
+        self._busy = False
+        self._error = None
+        self._thread = None
+
+    def submit(self, text):
+        with self._cond:
+            self._pending = text
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='pyperclip-copy_async')
+                self._thread.daemon = True
+                self._thread.start()
+                atexit.register(self._flush_at_exit)
+            self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is self._NOTHING:
+                    self._cond.wait()
+                text, self._pending = self._pending, self._NOTHING
+                self._busy = True
+
+            error = None
+            try:
+                copy(text)
+            except Exception as exc:
+                error = exc
+
+            with self._cond:
+                self._busy = False
+                self._error = error
+                self._cond.notify_all()
+
+    def flush(self, timeout=None):  # type: (Optional[float]) -> None
+        with self._cond:
+            if timeout is not None:
+                deadline = time.time() + timeout
+            while self._busy or self._pending is not self._NOTHING:
+                if timeout is None:
+                    self._cond.wait()
+                else:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        raise PyperclipTimeoutException('flush() timed out after ' + str(timeout) + ' seconds.')
+                    self._cond.wait(remaining)
+            error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def _flush_at_exit(self, timeout=5.0):
+        # A hung clipboard mechanism mustn't keep the interpreter from exiting,
+        # and a failed last copy is reported as a warning, not a traceback.
+        try:
+            self.flush(timeout)
+        except Exception as exc:
+            warnings.warn('Text passed to copy_async() was not copied before exiting: %s' % (exc,))
+
+
+_async_copier = _AsyncCopier()
+
+
+def copy_async(text):
+    '''
+    Copies text to the clipboard on a background thread and returns
+    immediately. If copy_async() is called again before the background thread
+    has copied the text, only the newest text is copied, so a rapid burst of
+    calls costs a single copy() call.
+
+    Call flush() to wait until the text is on the clipboard. Any text still
+    pending when the program exits is copied before it exits, waiting up to
+    five seconds.
+    '''
+    _async_copier.submit(text)
+
+
+def flush(timeout=None):  # type: (Optional[float]) -> None
+    '''
+    Blocks until text passed to copy_async() has been copied to the clipboard.
+    Raises the exception from the last background copy() call if it failed,
+    or PyperclipTimeoutException if timeout seconds pass first.
+    '''
+    _async_copier.flush(timeout)
+
+
+class _HistoryEntry(object):
+    __slots__ = ('data', 'compressed', 'timestamp')
+
+    def __init__(self, data, compressed, timestamp):
+        self.data = data  # type: bytes
+        self.compressed = compressed  # type: bool
+        self.timestamp = timestamp  # type: float
+
+    def text(self):
+        data = self.data
+        if self.compressed:
+            data = zlib.decompress(data)
+        return data.decode(ENCODING)
+
+
+class History(object):
+    '''
+    A record of recently copied and pasted text that stays within a byte
+    budget. Identical text is only stored once, and the least recently used
+    entries are evicted when the budget is exceeded. Entries at least
+    compress_threshold bytes long are stored zlib-compressed.
+
+    Call attach() to have every copy() and paste() call recorded:
+
+        history = pyperclip.History(max_bytes=1024 * 1024).attach()
+        pyperclip.copy('Hello, world!')
+        'Hello, world!' in history  # True
+
+    Iterating over a History yields its text, most recently used first.
+    '''
+
+    def __init__(self, max_bytes=1024 * 1024, compress_threshold=4096):
+        # type: (int, int) -> None
+        self.max_bytes = max_bytes
+        self.compress_threshold = compress_threshold
+        self._entries = collections.OrderedDict()  # Maps digest to entry, least recently used first.
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _digest(data):  # type: (bytes) -> bytes
+        return hashlib.blake2b(data, digest_size=16).digest()
+
+    def add(self, text):
+        '''Records text, or marks it as most recently used if already recorded.'''
+        data = _PYTHON_STR_TYPE(text).encode(ENCODING)
+        digest = self._digest(data)
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None:
+                entry.timestamp = time.time()
+                self._entries.move_to_end(digest)
+                return
+
+            compressed = False
+            if len(data) >= self.compress_threshold:
+                packed = zlib.compress(data)
+                if len(packed) < len(data):
+                    data, compressed = packed, True
+            if len(data) > self.max_bytes:
+                return  # Too large to fit in the budget at all.
+
+            self._entries[digest] = _HistoryEntry(data, compressed, time.time())
+            self._nbytes += len(data)
+            while self._nbytes > self.max_bytes:
+                _digest, evicted = self._entries.popitem(last=False)
+                self._nbytes -= len(evicted.data)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+
+    @property
+    def nbytes(self):  # type: () -> int
+        '''The number of bytes used to store the recorded text.'''
+        return self._nbytes
+
+    def __contains__(self, text):
+        return self._digest(_PYTHON_STR_TYPE(text).encode(ENCODING)) in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        with self._lock:
+            entries = list(self._entries.values())
+        for entry in reversed(entries):
+            yield entry.text()
+
+    def attach(self):
+        '''Starts recording every copy() and paste() call. Returns self.'''
+        _add_hook(self._hook)
+        return self
+
+    def detach(self):
+        '''Stops recording copy() and paste() calls.'''
+        _remove_hook(self._hook)
+
+    def _hook(self, op, call, *args, **kwargs):
+        result = call(*args, **kwargs)
+        if op == 'copy':
+            self.add(args[0] if args else kwargs['text'])
+        elif isinstance(result, _PYTHON_STR_TYPE):
+            self.add(result)
+        return result
+
+
+# X11 selection change notifications, using the XFixes extension through ctypes:
+class _XFixesSelectionNotifyEvent(ctypes.Structure):
+    _fields_ = [('type', ctypes.c_int),
+                ('serial', ctypes.c_ulong),
+                ('send_event', ctypes.c_int),
+                ('display', ctypes.c_void_p),
+                ('window', ctypes.c_ulong),
+                ('subtype', ctypes.c_int),
+                ('owner', ctypes.c_ulong),
+                ('selection', ctypes.c_ulong),
+                ('timestamp', ctypes.c_ulong),
+                ('selection_timestamp', ctypes.c_ulong)]
+
+
+class _XSelectionRequestEvent(ctypes.Structure):
+    _fields_ = [('type', ctypes.c_int),
+                ('serial', ctypes.c_ulong),
+                ('send_event', ctypes.c_int),
+                ('display', ctypes.c_void_p),
+                ('owner', ctypes.c_ulong),
+                ('requestor', ctypes.c_ulong),
+                ('selection', ctypes.c_ulong),
+                ('target', ctypes.c_ulong),
+                ('property', ctypes.c_ulong),
+                ('time', ctypes.c_ulong)]
+
+
+class _XSelectionEvent(ctypes.Structure):
+    _fields_ = [('type', ctypes.c_int),
+                ('serial', ctypes.c_ulong),
+                ('send_event', ctypes.c_int),
+                ('display', ctypes.c_void_p),
+                ('requestor', ctypes.c_ulong),
+                ('selection', ctypes.c_ulong),
+                ('target', ctypes.c_ulong),
+                ('property', ctypes.c_ulong),
+                ('time', ctypes.c_ulong)]
+
+
+class _XSelectionClearEvent(ctypes.Structure):
+    _fields_ = [('type', ctypes.c_int),
+                ('serial', ctypes.c_ulong),
+                ('send_event', ctypes.c_int),
+                ('display', ctypes.c_void_p),
+                ('window', ctypes.c_ulong),
+                ('selection', ctypes.c_ulong),
+                ('time', ctypes.c_ulong)]
+
+
+class _XPropertyEvent(ctypes.Structure):
+    _fields_ = [('type', ctypes.c_int),
+                ('serial', ctypes.c_ulong),
+                ('send_event', ctypes.c_int),
+                ('display', ctypes.c_void_p),
+                ('window', ctypes.c_ulong),
+                ('atom', ctypes.c_ulong),
+                ('time', ctypes.c_ulong),
+                ('state', ctypes.c_int)]
+
+
+class _XEvent(ctypes.Union):
+    _fields_ = [('type', ctypes.c_int),
+                ('xfixesselection', _XFixesSelectionNotifyEvent),
+                ('xselectionrequest', _XSelectionRequestEvent),
+                ('xselection', _XSelectionEvent),
+                ('xselectionclear', _XSelectionClearEvent),
+                ('xproperty', _XPropertyEvent),
+                ('pad', ctypes.c_long * 24)]
+
+
+# X11 errors on an _X11Owner's own connection (such as a requestor's window
+# vanishing mid-transfer) are ignored, instead of reaching Xlib's default
+# handler, which exits the process. Errors on other connections (from Tk or
+# Qt in the same process, say) are passed to the handler installed before.
+_XErrorHandler = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_void_p, ctypes.c_void_p)
+_x11_owner_displays = set()
+_previous_x11_error_handler = []  # Holds the replaced handler while any _X11Owner runs.
+_x11_error_lock = threading.Lock()
+
+
+def _handle_x11_error(dpy, error):
+    if dpy in _x11_owner_displays:
+        return 0
+    if _previous_x11_error_handler and _previous_x11_error_handler[0]:
+        return _previous_x11_error_handler[0](dpy, error)
+    return 0
+
+
+_x11_error_handler = _XErrorHandler(_handle_x11_error)
+
+
+def _ignore_x11_errors(xlib, dpy):
+    '''Starts ignoring X11 errors on the connection dpy.'''
+    with _x11_error_lock:
+        if not _x11_owner_displays:
+            previous = xlib.XSetErrorHandler(_x11_error_handler)
+            _previous_x11_error_handler[:] = [_XErrorHandler(previous) if previous else None]
+        _x11_owner_displays.add(dpy)
+
+
+def _restore_x11_errors(xlib, dpy):
+    '''Stops ignoring X11 errors on dpy, restoring the previous handler once no owner needs it.'''
+    with _x11_error_lock:
+        _x11_owner_displays.discard(dpy)
+        if _x11_owner_displays or not _previous_x11_error_handler:
+            return
+        previous = _previous_x11_error_handler.pop()
+        current = xlib.XSetErrorHandler(previous)
+        if current != ctypes.cast(_x11_error_handler, ctypes.c_void_p).value:
+            # Something else replaced our handler since, so keep theirs.
+            xlib.XSetErrorHandler(_XErrorHandler(current) if current else None)
+
+
+def _load_xlib():
+    '''Returns the libX11 ctypes library, or raises PyperclipException.'''
+    xlib_path = ctypes.util.find_library('X11')
+    if not xlib_path:
+        raise PyperclipException('This requires the libX11 library.')
+    xlib = ctypes.CDLL(xlib_path)
+    xlib.XOpenDisplay.argtypes = [ctypes.c_char_p]
+    xlib.XOpenDisplay.restype = ctypes.c_void_p
+    xlib.XCloseDisplay.argtypes = [ctypes.c_void_p]
+    xlib.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+    xlib.XDefaultRootWindow.restype = ctypes.c_ulong
+    xlib.XInternAtom.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_int]
+    xlib.XInternAtom.restype = ctypes.c_ulong
+    xlib.XConnectionNumber.argtypes = [ctypes.c_void_p]
+    xlib.XPending.argtypes = [ctypes.c_void_p]
+    xlib.XNextEvent.argtypes = [ctypes.c_void_p, ctypes.POINTER(_XEvent)]
+    xlib.XFlush.argtypes = [ctypes.c_void_p]
+    xlib.XCreateSimpleWindow.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.c_int, ctypes.c_int, ctypes.c_uint,
+                                         ctypes.c_uint, ctypes.c_uint, ctypes.c_ulong, ctypes.c_ulong]
+    xlib.XCreateSimpleWindow.restype = ctypes.c_ulong
+    xlib.XDestroyWindow.argtypes = [ctypes.c_void_p, ctypes.c_ulong]
+    xlib.XSelectInput.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.c_long]
+    xlib.XSetSelectionOwner.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.c_ulong, ctypes.c_ulong]
+    xlib.XGetSelectionOwner.argtypes = [ctypes.c_void_p, ctypes.c_ulong]
+    xlib.XGetSelectionOwner.restype = ctypes.c_ulong
+    xlib.XConvertSelection.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.c_ulong, ctypes.c_ulong,
+                                       ctypes.c_ulong, ctypes.c_ulong]
+    xlib.XChangeProperty.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.c_ulong, ctypes.c_ulong,
+                                     ctypes.c_int, ctypes.c_int, ctypes.c_void_p, ctypes.c_int]
+    xlib.XGetWindowProperty.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.c_ulong, ctypes.c_long,
+                                        ctypes.c_long, ctypes.c_int, ctypes.c_ulong,
+                                        ctypes.POINTER(ctypes.c_ulong), ctypes.POINTER(ctypes.c_int),
+                                        ctypes.POINTER(ctypes.c_ulong), ctypes.POINTER(ctypes.c_ulong),
+                                        ctypes.POINTER(ctypes.c_void_p)]
+    xlib.XFree.argtypes = [ctypes.c_void_p]
+    xlib.XSendEvent.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.c_int, ctypes.c_long, ctypes.POINTER(_XEvent)]
+    xlib.XWindowEvent.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.c_long, ctypes.POINTER(_XEvent)]
+    xlib.XMaxRequestSize.argtypes = [ctypes.c_void_p]
+    xlib.XMaxRequestSize.restype = ctypes.c_long
+    xlib.XExtendedMaxRequestSize.argtypes = [ctypes.c_void_p]
+    xlib.XExtendedMaxRequestSize.restype = ctypes.c_long
+    xlib.XSetErrorHandler.argtypes = [_XErrorHandler]
+    xlib.XSetErrorHandler.restype = ctypes.c_void_p
+    return xlib
+
+
+def _load_xfixes():
+    '''Returns the (libX11, libXfixes) ctypes libraries, or raises PyperclipException.'''
+    xfixes_path = ctypes.util.find_library('Xfixes')
+    if not xfixes_path:
+        raise PyperclipException('Watching the X11 clipboard requires the libX11 and libXfixes libraries.')
+    xlib = _load_xlib()
+    xfixes = ctypes.CDLL(xfixes_path)
+    xfixes.XFixesQueryExtension.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int)]
+    xfixes.XFixesSelectSelectionInput.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.c_ulong, ctypes.c_ulong]
+    return xlib, xfixes
+
+
+def _watch_x11_selection(on_change, stop, primary=False, display=None, ready=None):
+    '''
+    Calls on_change(timestamp) each time the X11 CLIPBOARD (or PRIMARY)
+    selection gets a new owner, until the threading.Event stop is set. The
+    timestamp is the server time at which the owner took the selection. The
+    threading.Event ready, if given, is set once changes are being watched.
+    '''
+    XFixesSelectionNotify = 0
+    XFixesSetSelectionOwnerNotifyMask = 1
+
+    xlib, xfixes = _load_xfixes()
+    dpy = xlib.XOpenDisplay(display.encode() if display else None)
+    if not dpy:
+        raise PyperclipException('Could not open X11 display ' + repr(display or os.getenv('DISPLAY')))
+    try:
+        event_base, error_base = ctypes.c_int(), ctypes.c_int()
+        if not xfixes.XFixesQueryExtension(dpy, ctypes.byref(event_base), ctypes.byref(error_base)):
+            raise PyperclipException('The X11 server does not support the XFixes extension.')
+        selection = xlib.XInternAtom(dpy, b'PRIMARY' if primary else b'CLIPBOARD', False)
+        xfixes.XFixesSelectSelectionInput(dpy, xlib.XDefaultRootWindow(dpy), selection,
+                                          XFixesSetSelectionOwnerNotifyMask)
+        xlib.XFlush(dpy)
+        if ready is not None:
+            ready.set()
+        event = _XEvent()
+        while not stop.is_set():
+            while xlib.XPending(dpy):
+                xlib.XNextEvent(dpy, ctypes.byref(event))
+                if event.type == event_base.value + XFixesSelectionNotify:
+                    on_change(event.xfixesselection.selection_timestamp)
+            # Wakes up now and then only to check the stop event.
+            select.select([xlib.XConnectionNumber(dpy)], [], [], 0.5)
+    finally:
+        xlib.XCloseDisplay(dpy)
+
+
+def _watch_wayland_selection(on_change, stop, primary=False, ready=None):
+    '''
+    Calls on_change(serial) each time the Wayland clipboard (or primary
+    selection) gets a new offer, until the threading.Event stop is set. The
+    serial counts the offers seen by this watcher. The threading.Event ready,
+    if given, is set once changes are being watched.
+    '''
+    # `wl-paste --watch CMD` runs CMD for every new offer, piping the offer
+    # to its stdin; `echo` ignores it and writes one line per offer.
+    args = ['wl-paste', '--watch', 'echo']
+    if primary:
+        args.insert(1, '-p')
+    p = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE, close_fds=True)
+    fd = p.stdout.fileno()
+
+    def read_offers(timeout):
+        # Reads the raw fd, since a buffered readline() can swallow several
+        # lines that then never wake select() up. Returns the offers seen.
+        if not select.select([fd], [], [], timeout)[0]:
+            return 0
+        data = os.read(fd, 4096)
+        if not data:
+            raise PyperclipException('wl-paste --watch exited unexpectedly.')
+        return data.count(b'\n')
+
+    serial = 0
+    try:
+        # The compositor announces the current offer as soon as wl-paste
+        # connects. That isn't a change, so it's skipped if it shows up, but
+        # any offers that arrive along with it are counted.
+        serial = max(0, read_offers(0.25) - 1)
+        if ready is not None:
+            ready.set()
+        if serial:
+            on_change(serial)
+        while not stop.is_set():
+            offers = read_offers(0.5)
+            if offers:
+                serial += offers
+                on_change(serial)
+    finally:
+        p.terminate()
+        p.communicate()
+
+
+class _X11Owner(object):
+    '''
+    Owns X11 selections in-process, so copies don't each leave behind an
+    xclip or xsel process serving the selection. One owner per display runs
+    on a daemon thread with its own X11 connection and an unmapped window,
+    answering TARGETS, MULTIPLE, TIMESTAMP, UTF8_STRING, TEXT, and STRING
+    requests until another client takes the selection. At exit, the CLIPBOARD
+    contents are handed off to a clipboard manager, if one is running, with
+    the ICCCM SAVE_TARGETS protocol.
+
+    Copies too large for a single X11 request (the INCR protocol isn't
+    supported) are refused, and the caller falls back to a helper process
+    (see _start_x11_helper()).
+    '''
+
+    SELECTION_CLEAR = 29
+    SELECTION_REQUEST = 30
+    SELECTION_NOTIFY = 31
+    PROPERTY_CHANGE_MASK = 1 << 22
+
+    def __init__(self, display=None):
+        self.display = display
+        self.xlib = xlib = _load_xlib()
+        self.dpy = xlib.XOpenDisplay(display.encode() if display else None)
+        if not self.dpy:
+            raise PyperclipException('Could not open X11 display ' + repr(display or os.getenv('DISPLAY')))
+        _ignore_x11_errors(xlib, self.dpy)
+        self.window = xlib.XCreateSimpleWindow(self.dpy, xlib.XDefaultRootWindow(self.dpy), 0, 0, 1, 1, 0, 0, 0)
+        xlib.XSelectInput(self.dpy, self.window, self.PROPERTY_CHANGE_MASK)
+        self.atoms = dict((name, xlib.XInternAtom(self.dpy, name.encode(), False)) for name in (
+            'PRIMARY', 'CLIPBOARD', 'TARGETS', 'MULTIPLE', 'TIMESTAMP', 'UTF8_STRING', 'TEXT', 'STRING',
+            'ATOM', 'ATOM_PAIR', 'INTEGER', 'CLIPBOARD_MANAGER', 'SAVE_TARGETS', 'PYPERCLIP_TIMESTAMP'))
+        # Leaves room for the ChangeProperty request's own header.
+        self.max_bytes = max(xlib.XExtendedMaxRequestSize(self.dpy), xlib.XMaxRequestSize(self.dpy)) * 4 - 1024
+        self.owned = {}  # Maps selection atoms to (utf-8 bytes, timestamp) for the selections this owns.
+        self.handed_off = threading.Event()
+
+        self.jobs = queue.Queue()
+        self.wake_read, self.wake_write = os.pipe()
+        self.stopped = False
+        self.thread = threading.Thread(target=self.run, name='pyperclip-x11-owner')
+        self.thread.daemon = True
+        self.thread.start()
+        atexit.register(self.close)
+
+    def submit(self, func):
+        '''Runs func on the owner's thread, returning a concurrent.futures.Future.'''
+        if self.stopped:
+            raise PyperclipException('The X11 selection owner has stopped.')
+        future = concurrent.futures.Future()
+        self.jobs.put((func, future))
+        try:
+            os.write(self.wake_write, b'x')
+        except OSError:  # The thread stopped, closing the pipe, in the meantime.
+            raise PyperclipException('The X11 selection owner has stopped.')
+        return future
+
+    def wait(self, future, timeout):
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            raise PyperclipTimeoutException('The X11 selection owner timed out after %s seconds.' % (timeout,))
+
+    def copy(self, data, primary=False, timeout=None):
+        '''
+        Takes ownership of the selection and serves data (utf-8 bytes) from it.
+        Returns False, without taking it, if data is too large to serve.
+        '''
+        if len(data) > self.max_bytes:
+            return False
+        selection = self.atoms['PRIMARY' if primary else 'CLIPBOARD']
+        self.wait(self.submit(lambda: self.take(selection, data)), timeout)
+        return True
+
+    def selection_owner(self, primary=False, timeout=None):
+        '''Returns the window that owns the selection, which is 0 if none does.'''
+        selection = self.atoms['PRIMARY' if primary else 'CLIPBOARD']
+        return self.wait(self.submit(lambda: self.xlib.XGetSelectionOwner(self.dpy, selection)), timeout)
+
+    def paste(self, primary=False, timeout=None):
+        '''Returns the selection's text if this still owns it, or None.'''
+        selection = self.atoms['PRIMARY' if primary else 'CLIPBOARD']
+
+        def owned_data():
+            if selection in self.owned and self.xlib.XGetSelectionOwner(self.dpy, selection) == self.window:
+                return self.owned[selection][0]
+            return None
+        data = self.wait(self.submit(owned_data), timeout)
+        return None if data is None else data.decode(ENCODING)
+
+    def close(self, timeout=1.0):
+        '''Hands CLIPBOARD off to a clipboard manager and stops the owner's thread.'''
+        if self.stopped or not self.thread.is_alive():
+            return
+        clipboard, manager = self.atoms['CLIPBOARD'], self.atoms['CLIPBOARD_MANAGER']
+
+        def request_handoff():
+            if clipboard not in self.owned or not self.xlib.XGetSelectionOwner(self.dpy, manager):
+                return False
+            # A property of None asks the manager to save every target.
+            self.xlib.XConvertSelection(self.dpy, manager, self.atoms['SAVE_TARGETS'], 0, self.window,
+                                        self.owned[clipboard][1])
+            return True
+
+        try:
+            if self.wait(self.submit(request_handoff), timeout):
+                # Requests from the manager are served until it says it's done.
+                self.handed_off.wait(timeout)
+        except PyperclipException:
+            pass
+
+        def stop():
+            self.stopped = True
+        try:
+            self.submit(stop)
+        except PyperclipException:
+            return
+        self.thread.join(timeout)
+
+    def take(self, selection, data):
+        xlib, dpy = self.xlib, self.dpy
+        # ICCCM asks for a real server timestamp rather than CurrentTime. A
+        # zero-length property append gets one from the PropertyNotify event.
+        event = _XEvent()
+        xlib.XChangeProperty(dpy, self.window, self.atoms['PYPERCLIP_TIMESTAMP'], self.atoms['INTEGER'],
+                             32, 2, None, 0)  # 2 is PropModeAppend.
+        xlib.XWindowEvent(dpy, self.window, self.PROPERTY_CHANGE_MASK, ctypes.byref(event))
+        timestamp = event.xproperty.time
+
+        xlib.XSetSelectionOwner(dpy, selection, self.window, timestamp)
+        if xlib.XGetSelectionOwner(dpy, selection) != self.window:
+            raise PyperclipException('Could not take ownership of the X11 selection.')
+        self.owned[selection] = (data, timestamp)
+
+    def set_property(self, window, prop, prop_type, format, items):
+        if format == 8:
+            buffer, length = items, len(items)
+        else:
+            buffer, length = (ctypes.c_ulong * len(items))(*items), len(items)
+        self.xlib.XChangeProperty(self.dpy, window, prop, prop_type, format, 0, buffer, length)  # 0 is PropModeReplace.
+
+    def convert(self, requestor, selection, target, prop):
+        '''Stores the selection, converted to target, in the requestor's property. Returns False if it can't.'''
+        atoms = self.atoms
+        if selection not in self.owned:
+            return False
+        data, timestamp = self.owned[selection]
+        if target == atoms['TARGETS']:
+            targets = [atoms[name] for name in ('TARGETS', 'MULTIPLE', 'TIMESTAMP', 'UTF8_STRING', 'TEXT', 'STRING')]
+            self.set_property(requestor, prop, atoms['ATOM'], 32, targets)
+        elif target == atoms['TIMESTAMP']:
+            self.set_property(requestor, prop, atoms['INTEGER'], 32, [timestamp])
+        elif target in (atoms['UTF8_STRING'], atoms['TEXT']):
+            self.set_property(requestor, prop, atoms['UTF8_STRING'], 8, data)
+        elif target == atoms['STRING']:
+            self.set_property(requestor, prop, atoms['STRING'], 8,
+                              data.decode(ENCODING).encode('latin-1', 'replace'))
+        else:
+            return False
+        return True
+
+    def convert_multiple(self, requestor, selection, prop):
+        # The property holds (target, property) atom pairs. Pairs that can't
+        # be converted have their property replaced with None.
+        xlib = self.xlib
+        actual_type, actual_format = ctypes.c_ulong(), ctypes.c_int()
+        count, remaining, items = ctypes.c_ulong(), ctypes.c_ulong(), ctypes.c_void_p()
+        xlib.XGetWindowProperty(self.dpy, requestor, prop, 0, 0x1fffffff, False, 0,
+                                ctypes.byref(actual_type), ctypes.byref(actual_format),
+                                ctypes.byref(count), ctypes.byref(remaining), ctypes.byref(items))
+        if not items:
+            return False
+        try:
+            if actual_format.value != 32:
+                return False
+            pairs = list(ctypes.cast(items, ctypes.POINTER(ctypes.c_ulong))[:count.value])
+        finally:
+            xlib.XFree(items)
+        for i in range(0, len(pairs) - 1, 2):
+            if not self.convert(requestor, selection, pairs[i], pairs[i + 1]):
+                pairs[i + 1] = 0
+        self.set_property(requestor, prop, self.atoms['ATOM_PAIR'], 32, pairs)
+        return True
+
+    def handle(self, event):
+        if event.type == self.SELECTION_REQUEST:
+            request = event.xselectionrequest
+            prop = request.property or request.target  # Obsolete clients send a property of None.
+            if request.target == self.atoms['MULTIPLE']:
+                converted = bool(request.property) and self.convert_multiple(request.requestor, request.selection, prop)
+            else:
+                converted = self.convert(request.requestor, request.selection, request.target, prop)
+            reply = _XEvent()
+            reply.xselection.type = self.SELECTION_NOTIFY
+            reply.xselection.display = self.dpy
+            reply.xselection.requestor = request.requestor
+            reply.xselection.selection = request.selection
+            reply.xselection.target = request.target
+            reply.xselection.property = prop if converted else 0
+            reply.xselection.time = request.time
+            self.xlib.XSendEvent(self.dpy, request.requestor, False, 0, ctypes.byref(reply))
+        elif event.type == self.SELECTION_CLEAR:
+            self.owned.pop(event.xselectionclear.selection, None)
+        elif event.type == self.SELECTION_NOTIFY and event.xselection.selection == self.atoms['CLIPBOARD_MANAGER']:
+            self.handed_off.set()
+
+    def run(self):
+        xlib, dpy = self.xlib, self.dpy
+        event = _XEvent()
+        try:
+            while not self.stopped:
+                while not self.jobs.empty():
+                    func, future = self.jobs.get()
+                    try:
+                        future.set_result(func())
+                    except Exception as exc:
+                        future.set_exception(exc)
+                if self.stopped:
+                    break
+                # Jobs and conversions make round trips, which can move events
+                # into Xlib's queue, where select() wouldn't see them. So the
+                # queue is emptied right before waiting.
+                while xlib.XPending(dpy):
+                    xlib.XNextEvent(dpy, ctypes.byref(event))
+                    self.handle(event)
+                xlib.XFlush(dpy)
+                readable = select.select([xlib.XConnectionNumber(dpy), self.wake_read], [], [])[0]
+                if self.wake_read in readable:
+                    os.read(self.wake_read, 4096)
+        finally:
+            xlib.XDestroyWindow(dpy, self.window)
+            xlib.XCloseDisplay(dpy)
+            _restore_x11_errors(xlib, dpy)
+            os.close(self.wake_read)
+            os.close(self.wake_write)
+
+
+_x11_owners = {}  # Maps display names (None for $DISPLAY) to their _X11Owner.
+_x11_owners_lock = threading.Lock()
+
+
+def _x11_owner(display=None, create=True):
+    '''Returns the display's running _X11Owner, starting one if create is True, or None.'''
+    with _x11_owners_lock:
+        owner = _x11_owners.get(display)
+        if owner is not None and owner.thread.is_alive():
+            return owner
+        if not create:
+            return None
+        owner = _x11_owners[display] = _X11Owner(display)
+        return owner
+
+
+def _owned_text(display, primary, timeout):
+    '''Returns the selection's text if the display's _X11Owner still owns it, without spawning a process, or None.'''
+    owner = _x11_owner(display, create=False)
+    return None if owner is None else owner.paste(primary, timeout)
+
+
+_x11_helpers = []  # The xclip and xsel processes started by _start_x11_helper().
+_x11_helpers_lock = threading.Lock()
+
+
+def _start_x11_helper(args, display, primary, timeout, input=None, stdin=None):
+    '''
+    Starts an xclip or xsel process to serve a copy that the display's
+    _X11Owner can't serve itself, and waits until it owns the selection.
+    args must keep the program in the foreground (xclip's -quiet, xsel's
+    --nodetach) so that it stays a child process, counted by helper_count().
+    It exits by itself once another client takes the selection. The copied
+    data is either the bytes input or read from the file descriptor stdin.
+    '''
+    owner = _x11_owner(display)
+    previous_owner = owner.selection_owner(primary, timeout)
+    p = subprocess.Popen(args, stdin=subprocess.PIPE if stdin is None else stdin,
+                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, close_fds=True)
+    with _x11_helpers_lock:
+        _x11_helpers.append(p)
+    if stdin is None:
+        try:
+            p.stdin.write(input)
+        finally:
+            p.stdin.close()
+
+    deadline = None if timeout is None else time.time() + timeout
+    while owner.selection_owner(primary, timeout) == previous_owner:
+        if p.poll() is not None:
+            raise PyperclipException('%s exited without taking the X11 selection.' % (args[0],))
+        if deadline is not None and time.time() >= deadline:
+            raise PyperclipTimeoutException('%s timed out after %s seconds.' % (args[0], timeout))
+        time.sleep(0.005)
+
+
+def helper_count():  # type: () -> int
+    '''
+    Returns how many helpers are serving X11 selections copied with the
+    xclip-owner and xsel-owner clipboard mechanisms (or owner=True): each
+    in-process owner thread (see _X11Owner) that holds a selection, counted
+    once even if it holds both CLIPBOARD and PRIMARY, plus each live xclip or
+    xsel process started for a copy the owner couldn't serve, such as one
+    with a format. Copies that the owner serves never add to this.
+
+    The xclip and xsel processes that copies without owner=True leave
+    behind detach themselves, so they can't be counted.
+    '''
+    with _x11_owners_lock:
+        owners = [owner for owner in _x11_owners.values() if owner.thread.is_alive()]
+    count = len([owner for owner in owners if owner.owned])
+    with _x11_helpers_lock:
+        _x11_helpers[:] = [p for p in _x11_helpers if p.poll() is None]
+        return count + len(_x11_helpers)
+
+
+class _ChangeWatcher(object):
+    '''
+    Runs a clipboard mechanism's watch_changes function on a daemon thread,
+    keeping the token from its latest change notification.
+    '''
+
+    def __init__(self, watch):
+        self.key = _watch_key(watch)
+        self.watch = watch
+        self.token = 0
+        self.error = None
+        self.ready = threading.Event()
+        self.stop = threading.Event()
+        thread = threading.Thread(target=self._run, name='pyperclip-change_count')
+        thread.daemon = True
+        thread.start()
+        self.ready.wait()
+
+    def _run(self):
+        try:
+            self.watch(self._on_change, self.stop, ready=self.ready)
+        except Exception as exc:
+            self.error = exc
+        self.ready.set()
+
+    def _on_change(self, token):
+        self.token = token
+
+
+def _watch_key(watch):
+    '''
+    Returns what identifies a watch_changes function's backend and display.
+    Each init_xclip_clipboard() call makes a new functools.partial, so
+    watchers can't be compared by identity.
+    '''
+    if isinstance(watch, functools.partial):
+        return (watch.func, watch.args, tuple(sorted(watch.keywords.items())))
+    return watch
+
+
+_change_watcher = None
+_change_lock = threading.Lock()
+_hashed_changes = {'digest': None, 'count': 0}
+
+
+def change_count():
+    '''
+    Returns a token that increases every time the clipboard's contents
+    change, for cheaply checking whether the clipboard has changed (see
+    changed_since()). Tokens are only comparable with other tokens returned
+    while the same clipboard mechanism is in use.
+
+    With the xclip and xsel mechanisms, the token is the X11 server time at
+    which the current owner took the selection, from XFixes selection-owner
+    notifications, and the contents are never transferred. With wl-clipboard,
+    it counts `wl-paste --watch` offers; wl-paste pipes each offer's contents
+    to a command that discards them, so they're never read into Python.
+    Other mechanisms fall back to pasting and comparing a hash of the
+    contents.
+    '''
+    global _change_watcher
+    _ensure_clipboard()
+    watch = getattr(paste, 'watch_changes', None)
+    with _change_lock:
+        if _change_watcher is not None and (watch is None or _change_watcher.key != _watch_key(watch)):
+            _change_watcher.stop.set()  # Also closes its X11 connection or wl-paste process.
+            _change_watcher = None
+        if watch is not None and _change_watcher is None:
+            _change_watcher = _ChangeWatcher(watch)
+        watcher = _change_watcher
+
+        if watcher is None or watcher.error is not None:
+            # No watcher for this mechanism (or it failed, for instance
+            # because libXfixes isn't installed), so compare hashes.
+            digest = hashlib.blake2b(_PYTHON_STR_TYPE(paste()).encode(ENCODING), digest_size=16).digest()
+            if digest != _hashed_changes['digest']:
+                _hashed_changes['digest'] = digest
+                _hashed_changes['count'] += 1
+            return _hashed_changes['count']
+    return watcher.token
+
+
+def changed_since(token):
+    '''Returns True if the clipboard has changed since change_count() returned token.'''
+    return change_count() != token
+
+
+_BridgeEndpoint = collections.namedtuple('_BridgeEndpoint', 'name copy paste watch')
+
+
+def _bridge_endpoint(spec):
+    '''
+    Returns a _BridgeEndpoint for a selection spec, which is "x11:clipboard",
+    "x11:primary", "wayland:clipboard", or "wayland:primary".
+    '''
+    system, _, selection = spec.partition(':')
+    if selection not in ('clipboard', 'primary'):
+        raise ValueError('Selection must be "clipboard" or "primary", not %r' % (selection,))
+    primary = selection == 'primary'
+
+    if system == 'x11':
+        if _executable_exists('xclip'):
+            copy_func, paste_func = init_xclip_clipboard()
+        elif _executable_exists('xsel'):
+            copy_func, paste_func = init_xsel_clipboard()
+        else:
+            raise PyperclipException('Bridging X11 selections requires xclip or xsel.')
+        watch = functools.partial(_watch_x11_selection, primary=primary)
+    elif system == 'wayland':
+        copy_func, paste_func = init_wl_clipboard()
+        watch = functools.partial(_watch_wayland_selection, primary=primary)
+    else:
+        raise ValueError('Selection system must be "x11" or "wayland", not %r' % (system,))
+
+    def paste_text():
+        # Returns '' for non-text contents (such as an image) instead of
+        # pasting them, so they're never mirrored as empty text.
+        available = getattr(paste_func, 'available_formats', None)
+        if available is not None and not any(_is_text_format(format) for format in available(primary=primary)):
+            return u''
+        return paste_func(primary=primary)
+
+    return _BridgeEndpoint(spec, functools.partial(copy_func, primary=primary), paste_text, watch)
+
+
+def bridge(endpoints, stop=None):
+    '''
+    Mirrors text between selections until the threading.Event stop is set
+    (or forever, if stop is None). Each endpoint is a spec such as
+    "x11:primary", "x11:clipboard", "wayland:primary", or
+    "wayland:clipboard". For example, bridge(["x11:clipboard",
+    "wayland:clipboard"]) keeps the X11 and Wayland clipboards in sync.
+
+    Endpoints are watched for changes (with XFixes on X11 and
+    `wl-paste --watch` on Wayland) instead of being polled. Text is only
+    mirrored if it differs from the last text mirrored, so a mirrored write
+    doesn't echo back to where it came from. Empty and non-text contents
+    (such as images) aren't mirrored, so they never wipe the other selections.
+    '''
+    if len(endpoints) < 2:
+        raise ValueError('bridge() needs at least two selections.')
+    endpoints = [_bridge_endpoint(endpoint) if isinstance(endpoint, str) else endpoint
+                 for endpoint in endpoints]
+    if stop is None:
+        stop = threading.Event()
+
+    changes = queue.Queue()
+    watchers_stop = threading.Event()
+
+    def watch(endpoint):
+        try:
+            endpoint.watch(lambda token: changes.put((endpoint, None)), watchers_stop)
+        except Exception as exc:
+            changes.put((endpoint, exc))
+
+    for endpoint in endpoints:
+        thread = threading.Thread(target=watch, args=(endpoint,), name='pyperclip-bridge')
+        thread.daemon = True
+        thread.start()
+
+    last_digest = None
+    try:
+        while not stop.is_set():
+            try:
+                source, error = changes.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if error is not None:
+                raise error
+            text = source.paste()
+            if not text:
+                continue  # Empty or non-text contents.
+            digest = hashlib.blake2b(text.encode(ENCODING), digest_size=16).digest()
+            if digest == last_digest:
+                continue  # Our own mirrored write, or no real change.
+            last_digest = digest
+            for endpoint in endpoints:
+                if endpoint is not source:
+                    endpoint.copy(text)
+    finally:
+        watchers_stop.set()
+
+
+def _clipboard_name():  # type: () -> str
+    '''Returns the current clipboard mechanism's name, such as 'xclip', from its copy function.'''
+    name = getattr(getattr(copy, '_unhooked', copy), '__name__', 'no')
+    return name[len('copy_'):] if name.startswith('copy_') else name
+
+
+def _payload_bytes(payload):
+    if isinstance(payload, tuple):  # From paste(max_bytes=...).
+        payload = payload[0]
+    if isinstance(payload, bytes):  # From paste(format=...), or for copy(format=...).
+        return payload
+    return _PYTHON_STR_TYPE(payload).encode(ENCODING)
+
+
+class _Tracer(object):
+    '''
+    Appends a record of every copy(), paste(), and set_clipboard() call to a
+    trace file, one JSON object per line. Enabled by setting the
+    PYPERCLIP_TRACE environment variable to the trace file's path. Records
+    hold the payload's size and a hash of it, never the payload itself.
+
+    Tracing never breaks the calls it records: if the trace file can't be
+    opened or written, a warning is issued and tracing stops.
+    '''
+
+    def __init__(self, path):
+        self._path = path
+        self._file = None  # Opened by the first record.
+        self._failed = False
+        self._lock = threading.Lock()
+
+    def record(self, op, start, duration, **fields):
+        fields.update(op=op, t=round(start, 6), duration=round(duration, 6))
+        with self._lock:
+            if self._failed:
+                return
+            try:
+                # default=repr keeps unusual keyword arguments from failing the record.
+                line = json.dumps(fields, sort_keys=True, default=repr) + '\n'
+                if self._file is None:
+                    self._file = open(self._path, 'a')
+                self._file.write(line)
+                self._file.flush()
+            except (OSError, ValueError, TypeError) as exc:
+                self._failed = True
+                warnings.warn('Pyperclip stopped tracing to %r: %s' % (self._path, exc))
+
+    def hook(self, op, call, *args, **kwargs):
+        start = time.time()
+        # The payload is never logged, whether it's passed by position or keyword.
+        logged_kwargs = dict((key, value) for key, value in kwargs.items() if key != 'text')
+        try:
+            result = call(*args, **kwargs)
+        except Exception as exc:
+            self.record_call(op, start, logged_kwargs, error='%s: %s' % (type(exc).__name__, exc))
+            raise
+        if op == 'copy':
+            self.record_call(op, start, logged_kwargs, payload=args[0] if args else kwargs['text'])
+        else:
+            self.record_call(op, start, logged_kwargs, payload=result)
+        return result
+
+    def record_call(self, op, start, kwargs, payload=None, error=None):
+        duration = time.time() - start
+        fields = {'backend': _clipboard_name()}
+        if kwargs:
+            fields['kwargs'] = kwargs
+        if error is not None:
+            fields['error'] = error
+        else:
+            data = _payload_bytes(payload)
+            fields['size'] = len(data)
+            fields['hash'] = hashlib.blake2b(data, digest_size=8).hexdigest()
+        self.record(op, start, duration, **fields)
+
+
+def replay(path, clipboard=None, realtime=False):
+    '''
+    Re-issues the copy() and paste() calls recorded in the trace file at path
+    (see _Tracer), using the clipboard mechanism named by clipboard (see
+    set_clipboard()) or the current one. Copies use placeholder text of the
+    recorded size, since traces don't hold payloads. If realtime is True, the
+    recorded gaps between calls are kept.
+
+    Returns a list of (op, recorded_duration, replayed_duration) tuples.
+    '''
+    if clipboard is not None:
+        set_clipboard(clipboard)
+    _ensure_clipboard()
+    # Replayed calls bypass hooks, so they aren't traced again.
+    raw_copy = getattr(copy, '_unhooked', copy)
+    raw_paste = getattr(paste, '_unhooked', paste)
+
+    results = []
+    previous = None
+    with open(path) as fo:
+        for line in fo:
+            record = json.loads(line)
+            if record['op'] not in ('copy', 'paste') or 'error' in record:
+                continue
+            if realtime and previous is not None:
+                time.sleep(max(0, record['t'] - previous))
+            previous = record['t']
+
+            kwargs = record.get('kwargs', {})
+            start = time.time()
+            if record['op'] == 'copy':
+                text = b'x' * record['size'] if kwargs.get('format') else 'x' * record['size']
+                raw_copy(text, **kwargs)
+            else:
+                raw_paste(**kwargs)
+            results.append((record['op'], record['duration'], time.time() - start))
+    return results
 
 
 def is_available():
@@ -653,8 +2585,15 @@ def is_available():
 # set_clipboard() or determine_clipboard() is called first.
 copy, paste = lazy_load_stub_copy, lazy_load_stub_paste
 
+_tracer = None
+if os.getenv('PYPERCLIP_TRACE'):
+    _tracer = _Tracer(os.getenv('PYPERCLIP_TRACE'))
+    _add_hook(_tracer.hook)
 
 
-__all__ = ['copy', 'paste', 'set_clipboard', 'determine_clipboard']
+__all__ = ['copy', 'paste', 'paste_prefix', 'available_formats', 'copy_file',
+           'copy_async', 'flush', 'set_clipboard', 'determine_clipboard',
+           'paste_many', 'warmup', 'preserved', 'change_count', 'changed_since',
+           'replay', 'register_backend', 'helper_count', 'History']
 
 
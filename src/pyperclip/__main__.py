@@ -2,17 +2,46 @@ import pyperclip
 import sys
 
 if len(sys.argv) > 1 and sys.argv[1] in ('-c', '--copy'):
-    if len(sys.argv) > 2:
+    if len(sys.argv) > 3 and sys.argv[2] == '--file':
+        pyperclip.copy_file(sys.argv[3])
+    elif len(sys.argv) > 2:
         pyperclip.copy(sys.argv[2])
     else:
         pyperclip.copy(sys.stdin.read())
 elif len(sys.argv) > 1 and sys.argv[1] in ('-p', '--paste'):
     sys.stdout.write(pyperclip.paste())
+elif len(sys.argv) > 3 and sys.argv[1] == 'bridge':
+    try:
+        pyperclip.bridge(sys.argv[2:])
+    except KeyboardInterrupt:
+        pass
+elif len(sys.argv) > 2 and sys.argv[1] == 'replay':
+    results = pyperclip.replay(sys.argv[2], clipboard=sys.argv[3] if len(sys.argv) > 3 else None)
+    print('%-6s %6s %12s %12s %12s %12s' % ('op', 'count', 'trace p50', 'replay p50', 'trace p99', 'replay p99'))
+    for op in ('copy', 'paste'):
+        recorded = sorted(result[1] for result in results if result[0] == op)
+        replayed = sorted(result[2] for result in results if result[0] == op)
+        if not recorded:
+            continue
+        p50, p99 = len(recorded) // 2, min(len(recorded) - 1, len(recorded) * 99 // 100)
+        print('%-6s %6d %10.2fms %10.2fms %10.2fms %10.2fms' % (
+            op, len(recorded), recorded[p50] * 1000, replayed[p50] * 1000, recorded[p99] * 1000, replayed[p99] * 1000))
 else:
-    print('Usage: python -m pyperclip [-c | --copy] [text_to_copy] | [-p | --paste]')
+    print('Usage: python -m pyperclip [-c | --copy] [text_to_copy | --file FILE] | [-p | --paste]')
+    print('       python -m pyperclip bridge SELECTION SELECTION [SELECTION ...]')
+    print('       python -m pyperclip replay TRACE [CLIPBOARD]')
     print()
     print('If a text_to_copy argument is provided, it is copied to the')
-    print('clipboard. Otherwise, the stdin stream is copied to the')
+    print('clipboard. If --file is given, the contents of FILE are copied')
+    print('to the clipboard. Otherwise, the stdin stream is copied to the')
     print('clipboard. (If reading this in from the keyboard, press')
     print('CTRL-Z on Windows or CTRL-D on Linux/macOS to stop.')
-    print('When pasting, the clipboard will be written to stdout.')
\ No newline at end of file
+    print('When pasting, the clipboard will be written to stdout.')
+    print()
+    print('The bridge command keeps the given selections in sync until')
+    print('interrupted. Each SELECTION is x11:clipboard, x11:primary,')
+    print('wayland:clipboard, or wayland:primary.')
+    print()
+    print('The replay command re-issues the copies and pastes recorded in')
+    print('TRACE (written when PYPERCLIP_TRACE=TRACE is set) against the')
+    print('CLIPBOARD mechanism, or the default one, and compares latencies.')
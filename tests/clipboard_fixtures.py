@@ -0,0 +1,118 @@
+# coding: utf-8
+"""
+Fake clipboards and clipboard programs shared by the test modules.
+"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import pyperclip
+from pyperclip import _executable_exists
+
+
+def fake_clipboard():
+    contents = [u'']
+
+    def copy_fake(text):
+        contents[0] = pyperclip._PYTHON_STR_TYPE(text)
+
+    def paste_fake(max_bytes=None):
+        return pyperclip._truncate(contents[0], max_bytes)
+
+    return copy_fake, paste_fake
+
+
+# Stand-ins for the xclip and wl-clipboard programs, which keep each
+# selection's contents and target/MIME type in files under $FAKE_CLIPBOARD_DIR.
+# Writes are atomic, like taking an X11 selection.
+FAKE_PROGRAM = '''
+import os, sys, tempfile
+args = sys.argv[1:]
+name = os.path.basename(sys.argv[0])
+store = os.path.join(os.environ['FAKE_CLIPBOARD_DIR'], 'primary' if ('p' in args or '-p' in args) else 'clipboard')
+if '-display' in args:
+    display = args[args.index('-display') + 1]
+    if display == ':hang':
+        import time; time.sleep(60)  # Longer than any test's timeout; it gets killed.
+    store += display
+target = args[args.index('-t') + 1] if '-t' in args else None
+def load():
+    try:
+        with open(store + '.type') as fo:
+            return fo.read(), open(store, 'rb').read()
+    except IOError:
+        return None, b''
+def write(path, data):
+    fd, temp = tempfile.mkstemp(dir=os.environ['FAKE_CLIPBOARD_DIR'])
+    with os.fdopen(fd, 'wb') as fo:
+        fo.write(data)
+    os.replace(temp, path)
+if name == 'xclip' and '-o' not in args or name == 'wl-copy':
+    data = b'' if '--clear' in args else sys.stdin.buffer.read()
+    write(store, data)
+    write(store + '.type', (target or ('UTF8_STRING' if name == 'xclip' else 'text/plain;charset=utf-8')).encode())
+    sys.exit(0)
+stored_type, data = load()
+if '--list-types' in args or target == 'TARGETS':
+    types = [stored_type] if stored_type else []
+    if name == 'xclip' and types:
+        types.insert(0, 'TARGETS')
+    sys.stdout.write(''.join(t + '\\n' for t in types))
+elif target == stored_type or target in (None, 'text') and (
+        stored_type in (None, 'UTF8_STRING', 'STRING') or stored_type.startswith('text/')):
+    sys.stdout.buffer.write(data)
+else:
+    sys.stderr.write('target not available\\n')
+    sys.exit(1)
+'''
+
+
+class FakeProgramsTestCase(unittest.TestCase):
+    '''Puts FAKE_PROGRAM on $PATH as each of the programs named in programs.'''
+    programs = ('xclip', 'wl-copy', 'wl-paste')
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tempdir = tempfile.mkdtemp()
+        bindir = os.path.join(cls.tempdir, 'bin')
+        os.mkdir(bindir)
+        for name in cls.programs:
+            path = os.path.join(bindir, name)
+            with open(path, 'w') as fo:
+                fo.write('#!' + sys.executable + '\n' + FAKE_PROGRAM)
+            os.chmod(path, 0o755)
+        cls._saved_environ = os.environ.copy()
+        os.environ['PATH'] = bindir + os.pathsep + os.environ.get('PATH', '')
+        os.environ['FAKE_CLIPBOARD_DIR'] = cls.tempdir
+
+    @classmethod
+    def tearDownClass(cls):
+        os.environ.clear()
+        os.environ.update(cls._saved_environ)
+        shutil.rmtree(cls.tempdir)
+
+
+class TmuxTestCase(unittest.TestCase):
+    '''Runs a private tmux server, with $TMUX pointing at it.'''
+
+    @classmethod
+    def setUpClass(cls):
+        if not _executable_exists('tmux'):
+            raise unittest.SkipTest('tmux is not installed.')
+        cls.tempdir = tempfile.mkdtemp()
+        cls.socket = os.path.join(cls.tempdir, 'socket')
+        subprocess.check_call(['tmux', '-S', cls.socket, 'new-session', '-d'])
+        cls._saved_tmux = os.environ.get('TMUX')
+        os.environ['TMUX'] = cls.socket + ',0,0'
+
+    @classmethod
+    def tearDownClass(cls):
+        subprocess.call(['tmux', '-S', cls.socket, 'kill-server'])
+        if cls._saved_tmux is None:
+            del os.environ['TMUX']
+        else:
+            os.environ['TMUX'] = cls._saved_tmux
+        shutil.rmtree(cls.tempdir)
@@ -4,11 +4,22 @@ import unittest
 import random
 import os
 import platform
+import queue
+import base64
+import functools
+import json
+import shutil
+import subprocess
+import sys
+import threading
+import time
+import tempfile
+import warnings
 
 #import sys
 #sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from pyperclip import _executable_exists, HAS_DISPLAY
+from pyperclip import _executable_exists
 from pyperclip import (init_osx_pbcopy_clipboard, init_osx_pyobjc_clipboard,
                                   init_dev_clipboard_clipboard,
                                   init_qt_clipboard,
@@ -17,11 +28,17 @@ from pyperclip import (init_osx_pbcopy_clipboard, init_osx_pyobjc_clipboard,
                                   init_klipper_clipboard, init_no_clipboard)
 from pyperclip import init_windows_clipboard
 from pyperclip import init_wsl_clipboard
+from pyperclip import init_osc52_clipboard, init_tmux_clipboard
 
 from pyperclip import PyperclipException
+import pyperclip
+
+from clipboard_fixtures import fake_clipboard, FakeProgramsTestCase, TmuxTestCase
 
 random.seed(42) # Make the "random" tests reproducible.
 
+HAS_DISPLAY = bool(os.getenv('DISPLAY'))
+
 class _TestClipboard(unittest.TestCase):
     clipboard = None
     supports_unicode = True
@@ -106,6 +123,23 @@ class _TestClipboard(unittest.TestCase):
         with self.assertRaises(PyperclipException):
             self.copy([2, 4, 6, 8])
 
+    def test_paste_max_bytes(self):
+        msg = u"ಠ_ಠ" * 100
+        self.copy(msg)
+        self.assertEqual(self.paste(max_bytes=10000), (msg, False))
+        self.assertEqual(self.paste(max_bytes=7), (u"ಠ_ಠ"[:3], True))
+        self.assertEqual(self.paste(max_bytes=8), (u"ಠ_ಠ"[:3], True))
+
+    def test_copy_fd(self):
+        if not hasattr(self.copy, 'copy_fd'):
+            raise unittest.SkipTest()
+        msg = u"pyper\nclip ಠ_ಠ"
+        with tempfile.TemporaryFile() as fo:
+            fo.write(msg.encode('utf-8'))
+            fo.seek(0)
+            self.copy.copy_fd(fo.fileno())
+        self.assertEqual(self.paste(), msg)
+
 
 class TestCygwin(_TestClipboard):
     if 'cygwin' in platform.system().lower():
@@ -144,6 +178,79 @@ class TestQt(_TestClipboard):
             clipboard = init_qt_clipboard()
 
 
+class TestQtThread(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        try:
+            import PyQt5.QtWidgets
+        except ImportError:
+            raise unittest.SkipTest('PyQt5 is not installed.')
+        if not HAS_DISPLAY:
+            os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+        cls.clipboard = init_qt_clipboard()
+
+    def test_copy_paste_from_threads(self):
+        copy, paste = self.clipboard
+        results = []
+
+        def worker(i):
+            copy('thread %d' % i)
+            results.append(paste())
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(results), 10)
+        self.assertTrue(all(result.startswith('thread ') for result in results))
+
+    def test_submit_returns_futures(self):
+        copy, paste = self.clipboard
+        copy.submit('pyperclip').result()
+        self.assertEqual(paste.submit().result(), 'pyperclip')
+        self.assertEqual(paste(max_bytes=5), ('pyper', True))
+
+    def test_jobs_run_on_gui_thread(self):
+        # Even the calls made right after init_qt_clipboard() returns, while
+        # the GUI thread may still be entering its event loop.
+        script = '''
+import threading, pyperclip
+from PyQt5.QtWidgets import QApplication
+threads = []
+clipboard = QApplication.clipboard
+QApplication.clipboard = staticmethod(lambda: threads.append(threading.current_thread().name) or clipboard())
+copy, paste = pyperclip.init_qt_clipboard()
+copy('spam')
+paste()
+print(sorted(set(threads)))
+'''
+        self.assertEqual(self.run_script(script), "['pyperclip-qt']")
+
+    def run_script(self, script):
+        # Runs in a child process, which can own its own app.
+        env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get('QT_QPA_PLATFORM', 'offscreen'),
+                   PYTHONPATH=os.path.dirname(os.path.dirname(pyperclip.__file__)))
+        output = subprocess.check_output([sys.executable, '-c', script], env=env, timeout=30)
+        return output.decode().strip().splitlines()[-1]
+
+    def test_existing_application_without_event_loop(self):
+        # Calls from a worker thread mustn't wait for an event loop that
+        # nobody runs.
+        script = '''
+import threading, pyperclip
+from PyQt5.QtWidgets import QApplication
+app = QApplication([])
+copy, paste = pyperclip.init_qt_clipboard()
+results = []
+thread = threading.Thread(target=lambda: results.append(copy('spam') or paste()))
+thread.daemon = True
+thread.start()
+thread.join(5)
+print(results)
+'''
+        self.assertEqual(self.run_script(script), "['spam']")
+
+
 class TestXClip(_TestClipboard):
     if _executable_exists("xclip"):
         clipboard = init_xclip_clipboard()
@@ -164,6 +271,834 @@ class TestKlipper(_TestClipboard):
         clipboard = init_klipper_clipboard()
 
 
+class TestFormats(FakeProgramsTestCase):
+    def check_formats(self, copy, paste, text_type, image_type):
+        copy(u'ಠ_ಠ')
+        self.assertEqual(paste(), u'ಠ_ಠ')
+        self.assertIn(text_type, paste.available_formats())
+        self.assertEqual(paste(format=text_type), u'ಠ_ಠ'.encode('utf-8'))
+        self.assertEqual(paste(format=text_type, max_bytes=3), (u'ಠ'.encode('utf-8'), True))
+
+        with open(os.path.join(self.tempdir, 'clipboard.type'), 'w') as fo:
+            fo.write(image_type)
+        self.assertIn(image_type, paste.available_formats())
+        self.assertEqual(paste.available_formats(primary=True), [])
+
+    def test_xclip(self):
+        copy, paste = init_xclip_clipboard()
+        self.check_formats(copy, paste, 'UTF8_STRING', 'image/png')
+
+    def test_wl(self):
+        copy, paste = init_wl_clipboard()
+        self.check_formats(copy, paste, 'text/plain;charset=utf-8', 'image/png')
+
+    def test_unsupported(self):
+        saved = pyperclip.copy, pyperclip.paste
+        pyperclip.copy, pyperclip.paste = fake_clipboard()
+        try:
+            with self.assertRaises(PyperclipException):
+                pyperclip.available_formats()
+        finally:
+            pyperclip.copy, pyperclip.paste = saved
+
+
+class TestPreserved(FakeProgramsTestCase):
+    def setUp(self):
+        self._saved = pyperclip.copy, pyperclip.paste
+        pyperclip.copy, pyperclip.paste = init_xclip_clipboard()
+
+    def tearDown(self):
+        pyperclip.copy, pyperclip.paste = self._saved
+
+    def test_restores_text(self):
+        pyperclip.copy('original')
+        with pyperclip.preserved():
+            pyperclip.copy('temporary')
+            self.assertEqual(pyperclip.paste(), 'temporary')
+        self.assertEqual(pyperclip.paste(), 'original')
+
+    def test_restores_image(self):
+        png = b'\x89PNG\r\n\x1a\n'
+        pyperclip.copy(png, format='image/png')
+        with pyperclip.preserved():
+            pyperclip.copy('temporary')
+        self.assertEqual(pyperclip.available_formats(), ['TARGETS', 'image/png'])
+        self.assertEqual(pyperclip.paste(format='image/png'), png)
+
+    def test_unchanged_is_not_restored(self):
+        pyperclip.copy('original')
+        copies = []
+        copy_xclip = pyperclip.copy
+        pyperclip.copy = lambda *args, **kwargs: copies.append(args) or copy_xclip(*args, **kwargs)
+
+        with pyperclip.preserved():
+            pass
+        self.assertEqual(copies, [])
+        with pyperclip.preserved():
+            pyperclip.copy('temporary')
+        self.assertEqual(copies, [('temporary',), ('original',)])
+        self.assertEqual(pyperclip.paste(), 'original')
+
+    def test_restores_contents_replaced_elsewhere(self):
+        pyperclip.copy('original')
+        with pyperclip.preserved():
+            init_xclip_clipboard()[0]('copied by another program')
+        self.assertEqual(pyperclip.paste(), 'original')
+
+        with pyperclip.preserved():
+            pyperclip.copy_async('copied after the block')
+        self.assertEqual(pyperclip.paste(), 'original')
+
+    def test_snapshot_prefers_non_text_format(self):
+        def paste_offered(format=None):
+            return {'image/png': b'png', 'text/html': b'<b>', None: u'text'}[format]
+        paste_offered.available_formats = lambda: ['TARGETS', 'text/html', 'text/plain', 'image/png']
+        self.assertEqual(pyperclip._take_snapshot(paste_offered), (b'png', 'image/png'))
+        paste_offered.available_formats = lambda: ['TARGETS', 'text/html', 'text/plain']
+        self.assertEqual(pyperclip._take_snapshot(paste_offered), (u'text', None))
+
+
+class TestPasteMany(FakeProgramsTestCase):
+    def test_paste_many(self):
+        displays = [':%d' % i for i in range(1, 21)]
+        for display in displays:
+            init_xclip_clipboard(display=display)[0]('text on ' + display)
+        # The timeout is generous, so only ':hang' times out, however slow the stand-ins are.
+        results = pyperclip.paste_many(displays + [':hang'], max_workers=8, timeout=5)
+        self.assertEqual(set(results), set(displays + [':hang']))
+        for display in displays:
+            self.assertEqual(results[display], 'text on ' + display)
+        self.assertIsInstance(results[':hang'], pyperclip.PyperclipTimeoutException)
+
+    def test_max_bytes_timeout(self):
+        paste = init_xclip_clipboard(display=':hang', timeout=0.2)[1]
+        start = time.time()
+        with self.assertRaises(pyperclip.PyperclipTimeoutException):
+            paste(max_bytes=10)
+        self.assertLess(time.time() - start, 5)
+
+        init_xclip_clipboard(display=':1', timeout=5)[0]('pyperclip')
+        self.assertEqual(init_xclip_clipboard(display=':1', timeout=5)[1](max_bytes=5), ('pyper', True))
+
+    def test_display_does_not_touch_environment(self):
+        init_xclip_clipboard()[0]('default display')
+        init_xclip_clipboard(display=':7')[0]('display 7')
+        self.assertEqual(init_xclip_clipboard()[1](), 'default display')
+        self.assertEqual(init_xclip_clipboard(display=':7')[1](), 'display 7')
+
+
+class TestX11Owner(unittest.TestCase):
+    # Needs a real X server (such as Xvfb) and xclip, to paste from another client.
+    @classmethod
+    def setUpClass(cls):
+        if not (HAS_DISPLAY and _executable_exists('xclip')):
+            raise unittest.SkipTest('An X11 display and xclip are required.')
+
+    def test_one_helper_serves_every_copy(self):
+        copy, paste = init_xclip_clipboard(owner=True)
+        for i in range(50):
+            copy(u'owned ಠ_ಠ %d' % i)
+            self.assertLessEqual(pyperclip.helper_count(), 1)
+        self.assertEqual(pyperclip._owned_text(None, False, 1), u'owned ಠ_ಠ 49')
+        self.assertEqual(init_xclip_clipboard()[1](), u'owned ಠ_ಠ 49')  # Served to another client.
+        self.assertIn('UTF8_STRING', init_xclip_clipboard()[1].available_formats())
+        copy(u'primary', primary=True)
+        self.assertEqual(pyperclip.helper_count(), 1)  # One owner thread holds both selections.
+
+        init_xclip_clipboard()[0]('taken by xclip')
+        time.sleep(0.1)  # Lets the owner see that it lost the selection.
+        self.assertIsNone(pyperclip._owned_text(None, False, 1))
+        self.assertEqual(paste(), 'taken by xclip')
+
+
+class _TestFakeClipboard(unittest.TestCase):
+    def setUp(self):
+        self._saved = pyperclip.copy, pyperclip.paste
+        pyperclip.copy, pyperclip.paste = fake_clipboard()
+
+    def tearDown(self):
+        pyperclip.copy, pyperclip.paste = self._saved
+
+
+class TestCopyFile(_TestFakeClipboard):
+    msg = u"pyper\nclip ಠ_ಠ"
+
+    def setUp(self):
+        super(TestCopyFile, self).setUp()
+        fd, self.path = tempfile.mkstemp()
+        os.write(fd, self.msg.encode('utf-8'))
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.path)
+        super(TestCopyFile, self).tearDown()
+
+    def test_copy_file_path(self):
+        pyperclip.copy_file(self.path)
+        self.assertEqual(pyperclip.paste(), self.msg)
+
+    def test_copy_file_fd(self):
+        fd = os.open(self.path, os.O_RDONLY)
+        try:
+            pyperclip.copy_file(fd)
+            os.fstat(fd)  # The caller's descriptor is left open.
+        finally:
+            os.close(fd)
+        self.assertEqual(pyperclip.paste(), self.msg)
+
+    def test_copy_file_passes_fd_to_backend(self):
+        received = []
+        pyperclip.copy.copy_fd = lambda fd: received.append(os.read(fd, 1024))
+        pyperclip.copy_file(self.path)
+        self.assertEqual(received, [self.msg.encode('utf-8')])
+
+    def test_copy_file_runs_hooks(self):
+        received = []
+        pyperclip.copy.copy_fd = lambda fd: received.append(os.read(fd, 1024))
+        pyperclip.copy('original')
+        history = pyperclip.History().attach()
+        try:
+            with pyperclip.preserved():
+                pyperclip.copy_file(self.path)
+                self.assertEqual(pyperclip.paste(), self.msg)
+        finally:
+            history.detach()
+        self.assertEqual(received, [])
+        self.assertIn(self.msg, history)
+        self.assertEqual(pyperclip.paste(), 'original')
+
+
+class TestPasteLimited(unittest.TestCase):
+    def test_read_limited_stops_child(self):
+        p = subprocess.Popen([sys.executable, '-c', 'import sys; sys.stdout.write("x" * 10000000)'],
+                             stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        self.assertEqual(pyperclip._read_limited(p, 5), ('xxxxx', True))
+        self.assertIsNotNone(p.returncode)
+
+    def test_read_limited_small(self):
+        p = subprocess.Popen([sys.executable, '-c', 'import sys; sys.stdout.write("xxxxx")'],
+                             stdout=subprocess.PIPE)
+        self.assertEqual(pyperclip._read_limited(p, 5), ('xxxxx', False))
+
+    def test_truncate_drops_partial_character(self):
+        self.assertEqual(pyperclip._truncate(u'aಠ', 3), (u'a', True))
+        self.assertEqual(pyperclip._truncate(u'aಠ', 4), (u'aಠ', False))
+        self.assertEqual(pyperclip._truncate(u'aಠ', None), u'aಠ')
+
+
+class TestPastePrefix(_TestFakeClipboard):
+    def test_paste_prefix(self):
+        copy_fake, paste_fake = fake_clipboard()
+        pyperclip.copy = copy_fake
+        pyperclip.paste = lambda max_bytes=None: pyperclip._truncate(paste_fake(), max_bytes)
+        pyperclip.copy('MARKER: the rest')
+        self.assertEqual(pyperclip.paste_prefix(6), 'MARKER')
+        self.assertEqual(pyperclip.paste(max_bytes=100), ('MARKER: the rest', False))
+
+
+class TestFailover(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+        self.broken = set()
+        self.hung = set()
+
+    def fake_mechanism(self, name):
+        contents = [u'']
+
+        def copy_fake(text):
+            self.calls.append(name)
+            if name in self.hung:
+                time.sleep(0.5)
+            if name in self.broken:
+                raise PyperclipException(name + ' is broken')
+            contents[0] = text
+
+        def paste_fake():
+            self.calls.append(name)
+            return contents[0]
+        return name, lambda: (copy_fake, paste_fake)
+
+    def test_falls_back_in_order(self):
+        copy, paste = pyperclip.init_failover_clipboard(
+            [self.fake_mechanism('first'), self.fake_mechanism('second')])
+        copy('spam')
+        self.assertEqual(paste(), 'spam')
+        self.assertEqual(self.calls, ['first', 'first'])
+
+        self.broken.add('first')
+        copy('eggs')
+        self.assertEqual(self.calls[2:], ['first', 'second'])
+
+    def test_timeout(self):
+        copy, paste = pyperclip.init_failover_clipboard(
+            [self.fake_mechanism('slow'), self.fake_mechanism('fast')], timeout=0.05)
+        self.hung.add('slow')
+        start = time.time()
+        copy('spam')
+        self.assertLess(time.time() - start, 0.4)
+        self.assertEqual(self.calls, ['slow', 'fast'])
+
+    def test_circuit_breaker(self):
+        copy, paste = pyperclip.init_failover_clipboard(
+            [self.fake_mechanism('flaky'), self.fake_mechanism('backup')],
+            max_failures=2, recovery_interval=0.1)
+        self.broken.add('flaky')
+        for i in range(4):
+            copy(i)
+        # After two failures, flaky is demoted and no longer tried.
+        self.assertEqual(self.calls, ['flaky', 'backup', 'flaky', 'backup', 'backup', 'backup'])
+        self.assertTrue(copy.breakers[0].demoted)
+
+        # Once the recovery interval passes, flaky is probed again.
+        self.broken.discard('flaky')
+        time.sleep(0.15)
+        del self.calls[:]
+        copy('recovered')
+        self.assertEqual(self.calls, ['flaky'])
+        self.assertEqual(copy.breakers[0].failures, 0)
+
+    def test_all_fail(self):
+        copy, paste = pyperclip.init_failover_clipboard([self.fake_mechanism('only')])
+        self.broken.add('only')
+        with self.assertRaises(PyperclipException):
+            copy('spam')
+        with self.assertRaises(PyperclipException):
+            pyperclip.init_failover_clipboard([])[1]()
+
+
+class TestWarmup(unittest.TestCase):
+    def setUp(self):
+        self._saved = pyperclip.copy, pyperclip.paste, pyperclip.determine_clipboard
+        pyperclip.copy, pyperclip.paste = pyperclip.lazy_load_stub_copy, pyperclip.lazy_load_stub_paste
+        self.determined = 0
+        self.release = threading.Event()
+
+        def slow_determine_clipboard():
+            self.determined += 1
+            self.release.wait(1)
+            return fake_clipboard()
+        pyperclip.determine_clipboard = slow_determine_clipboard
+
+    def tearDown(self):
+        pyperclip.copy, pyperclip.paste, pyperclip.determine_clipboard = self._saved
+
+    def test_calls_wait_for_warmup(self):
+        thread = pyperclip.warmup()
+        while not self.determined:
+            time.sleep(0.001)
+        callers = [threading.Thread(target=pyperclip.copy, args=('spam',)) for _ in range(5)]
+        for caller in callers:
+            caller.start()
+        self.release.set()
+        thread.join()
+        for caller in callers:
+            caller.join()
+        self.assertEqual(self.determined, 1)
+        self.assertEqual(pyperclip.paste(), 'spam')
+
+    def test_hook_added_during_warmup(self):
+        thread = pyperclip.warmup()
+        while not self.determined:
+            time.sleep(0.001)
+        history = pyperclip.History()
+        attaching = threading.Thread(target=history.attach)
+        attaching.start()
+        attaching.join(0.05)
+        self.assertTrue(attaching.is_alive())  # Waits for the clipboard to be bound.
+        self.release.set()
+        thread.join()
+        attaching.join()
+        try:
+            pyperclip.copy('spam')
+        finally:
+            history.detach()
+        self.assertIn('spam', history)
+
+    def test_foreground(self):
+        self.release.set()
+        self.assertIsNone(pyperclip.warmup(background=False))
+        self.assertTrue(pyperclip.is_available())
+        pyperclip.warmup(background=False)
+        self.assertEqual(self.determined, 1)
+
+
+class TestBridge(unittest.TestCase):
+    def fake_endpoint(self, name):
+        # Copying to a fake selection fires its change event, like a real one.
+        contents = [u'']
+        events = queue.Queue()
+
+        def copy_fake(text):
+            self.copies.append((name, text))
+            contents[0] = text
+            events.put(None)
+
+        def watch(on_change, stop):
+            while not stop.is_set():
+                try:
+                    events.get(timeout=0.01)
+                except queue.Empty:
+                    continue
+                on_change(None)
+
+        return pyperclip._BridgeEndpoint(name, copy_fake, lambda: contents[0], watch)
+
+    def test_mirrors_without_echo(self):
+        self.copies = []
+        primary, clipboard = self.fake_endpoint('primary'), self.fake_endpoint('clipboard')
+        stop = threading.Event()
+        thread = threading.Thread(target=pyperclip.bridge, args=([primary, clipboard], stop))
+        thread.start()
+        try:
+            primary.copy('selected')
+            deadline = time.time() + 2
+            while clipboard.paste() != 'selected' and time.time() < deadline:
+                time.sleep(0.01)
+            time.sleep(0.1)  # Gives an echo time to happen, if it would.
+            self.assertEqual(self.copies, [('primary', 'selected'), ('clipboard', 'selected')])
+        finally:
+            stop.set()
+            thread.join()
+
+    def test_empty_is_not_mirrored(self):
+        self.copies = []
+        primary, clipboard = self.fake_endpoint('primary'), self.fake_endpoint('clipboard')
+        stop = threading.Event()
+        thread = threading.Thread(target=pyperclip.bridge, args=([primary, clipboard], stop))
+        thread.start()
+        try:
+            clipboard.copy('kept')
+            deadline = time.time() + 2
+            while primary.paste() != 'kept' and time.time() < deadline:
+                time.sleep(0.01)
+            primary.copy('')  # Such as an image, which pastes as no text.
+            time.sleep(0.1)
+            self.assertEqual(clipboard.paste(), 'kept')
+            self.assertEqual(self.copies, [('clipboard', 'kept'), ('primary', 'kept'), ('primary', '')])
+        finally:
+            stop.set()
+            thread.join()
+
+    def test_bad_spec(self):
+        with self.assertRaises(ValueError):
+            pyperclip.bridge(['x11:secondary', 'x11:clipboard'])
+        with self.assertRaises(ValueError):
+            pyperclip.bridge(['x11:clipboard'])
+
+
+class TestChangeCount(_TestFakeClipboard):
+    def test_hash_fallback(self):
+        pyperclip.copy('spam')
+        token = pyperclip.change_count()
+        self.assertFalse(pyperclip.changed_since(token))
+        pyperclip.copy('eggs')
+        self.assertTrue(pyperclip.changed_since(token))
+        self.assertGreater(pyperclip.change_count(), token)
+
+    def test_watcher(self):
+        changes = queue.Queue()
+
+        def watch_changes(on_change, stop, ready):
+            ready.set()
+            while True:
+                on_change(changes.get())
+
+        pastes = []
+        pyperclip.paste = lambda: pastes.append(None)
+        pyperclip.paste.watch_changes = watch_changes
+        token = pyperclip.change_count()
+        self.assertFalse(pyperclip.changed_since(token))
+        changes.put(1234)
+        deadline = time.time() + 1
+        while not pyperclip.changed_since(token) and time.time() < deadline:
+            time.sleep(0.001)
+        self.assertEqual(pyperclip.change_count(), 1234)
+        self.assertEqual(pastes, [])  # The contents were never fetched.
+
+    def test_rebinding_reuses_or_stops_watcher(self):
+        running = []
+
+        def watch_changes(on_change, stop, ready, display=None):
+            running.append(display)
+            ready.set()
+            stop.wait()
+            running.remove(display)
+
+        def bind(display):
+            pyperclip.paste = lambda: ''
+            pyperclip.paste.watch_changes = functools.partial(watch_changes, display=display)
+            pyperclip.change_count()
+
+        for i in range(5):
+            bind(':0')  # A new partial each time, like each init_xclip_clipboard() call.
+        self.assertEqual(running, [':0'])
+        bind(':1')
+        deadline = time.time() + 1
+        while running != [':1'] and time.time() < deadline:
+            time.sleep(0.001)
+        self.assertEqual(running, [':1'])
+        pyperclip.paste = lambda: ''
+        pyperclip.change_count()  # No watch_changes, so the old watcher stops.
+        deadline = time.time() + 1
+        while running and time.time() < deadline:
+            time.sleep(0.001)
+        self.assertEqual(running, [])
+
+
+class TestWaylandWatch(FakeProgramsTestCase):
+    programs = ('wl-paste',)
+
+    def test_offers_arriving_together(self):
+        # This wl-paste announces the current offer and a change at once.
+        with open(os.path.join(self.tempdir, 'bin', 'wl-paste'), 'w') as fo:
+            fo.write('#!' + sys.executable + '\nimport sys, time\nsys.stdout.write("\\n\\n")\n'
+                     'sys.stdout.flush()\ntime.sleep(10)\n')
+        changes = []
+        stop = threading.Event()
+        thread = threading.Thread(target=pyperclip._watch_wayland_selection, args=(changes.append, stop))
+        thread.start()
+        try:
+            deadline = time.time() + 2
+            while not changes and time.time() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(changes, [1])
+        finally:
+            stop.set()
+            thread.join()
+
+
+class TestTrace(_TestFakeClipboard):
+    def setUp(self):
+        super(TestTrace, self).setUp()
+        fd, self.path = tempfile.mkstemp()
+        os.close(fd)
+        self.tracer = pyperclip._Tracer(self.path)
+        pyperclip._add_hook(self.tracer.hook)
+
+    def tearDown(self):
+        pyperclip._remove_hook(self.tracer.hook)
+        if self.tracer._file is not None:
+            self.tracer._file.close()
+        os.remove(self.path)
+        super(TestTrace, self).tearDown()
+
+    def test_records_and_replays(self):
+        pyperclip.copy(u'ಠ_ಠ')
+        self.assertEqual(pyperclip.paste(), u'ಠ_ಠ')
+        with open(self.path) as fo:
+            records = [json.loads(line) for line in fo]
+        self.assertEqual([record['op'] for record in records], ['copy', 'paste'])
+        self.assertEqual({record['backend'] for record in records}, {'fake'})
+        self.assertEqual([record['size'] for record in records], [7, 7])
+        self.assertEqual(records[0]['hash'], records[1]['hash'])
+        self.assertNotIn(u'ಠ_ಠ', json.dumps(records))
+
+        results = pyperclip.replay(self.path)
+        self.assertEqual([result[0] for result in results], ['copy', 'paste'])
+        self.assertEqual(pyperclip.paste(), 'x' * 7)
+        with open(self.path) as fo:
+            self.assertEqual(len(fo.readlines()), 3)  # Only the paste above; replays aren't traced.
+
+    def test_keyword_copy(self):
+        pyperclip.copy(text='secret')
+        self.assertEqual(pyperclip.paste(), 'secret')
+        with open(self.path) as fo:
+            contents = fo.read()
+        self.assertNotIn('secret', contents)
+        record = json.loads(contents.splitlines()[0])
+        self.assertEqual((record['op'], record['size']), ('copy', 6))
+        self.assertNotIn('kwargs', record)
+
+    def test_unwritable_trace(self):
+        tracer = pyperclip._Tracer(os.path.join(self.path, 'not-a-directory', 'trace'))
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            self.assertEqual(tracer.hook('copy', lambda text: 'copied', 'spam'), 'copied')
+            tracer.hook('copy', lambda text: 'copied', 'spam')
+        self.assertEqual(len(caught), 1)  # Tracing stops after the first failure.
+
+
+class TestBackends(_TestFakeClipboard):
+    def setUp(self):
+        super(TestBackends, self).setUp()
+        self._saved_backends = dict(pyperclip._backends)
+        self._saved_loaded = pyperclip._entry_points_loaded
+        self._saved_path = list(sys.path)
+        pyperclip._backends.clear()
+        self.probed = []
+
+    def tearDown(self):
+        pyperclip._backends.clear()
+        pyperclip._backends.update(self._saved_backends)
+        pyperclip._entry_points_loaded = self._saved_loaded
+        sys.path[:] = self._saved_path
+        super(TestBackends, self).tearDown()
+
+    def register(self, name, usable, cost, priority):
+        def probe():
+            self.probed.append(name)
+            return usable
+        pyperclip.register_backend(name, lambda: fake_clipboard(), probe, cost, priority)
+
+    def test_cheapest_probes_first(self):
+        self.register('cheap', True, 0, 10)
+        self.register('better', True, 2, 20)
+        self.register('unusable', False, 1, 30)
+        self.register('worse', True, 3, 5)
+        self.assertEqual(pyperclip._choose_backend().name, 'better')
+        self.assertEqual(self.probed, ['cheap', 'unusable', 'better'])  # 'worse' can't win, so it isn't probed.
+        self.assertEqual([name for name, init in pyperclip._clipboard_candidates()], ['better', 'cheap', 'worse'])
+
+    def test_set_clipboard(self):
+        pyperclip.register_backend('explicit', lambda: fake_clipboard())
+        self.assertIsNone(pyperclip._choose_backend())  # No probe, so never chosen automatically.
+        pyperclip.set_clipboard('explicit')
+        pyperclip.copy('spam')
+        self.assertEqual(pyperclip.paste(), 'spam')
+        with self.assertRaises(ValueError):
+            pyperclip.set_clipboard('missing')
+
+    def test_entry_points(self):
+        tempdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tempdir)
+        with open(os.path.join(tempdir, 'fake_pyperclip_plugin.py'), 'w') as fo:
+            fo.write('def init():\n    return None, None\n'
+                     'init.probe = lambda: True\ninit.priority = 7\n')
+        dist_info = os.path.join(tempdir, 'fake_pyperclip_plugin-1.0.dist-info')
+        os.mkdir(dist_info)
+        with open(os.path.join(dist_info, 'METADATA'), 'w') as fo:
+            fo.write('Metadata-Version: 2.1\nName: fake-pyperclip-plugin\nVersion: 1.0\n')
+        with open(os.path.join(dist_info, 'entry_points.txt'), 'w') as fo:
+            fo.write('[pyperclip.backends]\nplugin = fake_pyperclip_plugin:init\n')
+        sys.path.insert(0, tempdir)
+        pyperclip._entry_points_loaded = False
+
+        backend = pyperclip._choose_backend()
+        self.assertEqual((backend.name, backend.priority), ('plugin', 7))
+
+
+class TestCopyAsync(_TestFakeClipboard):
+    def test_burst_is_coalesced(self):
+        copied = []
+        started = threading.Event()
+
+        def slow_copy(text):
+            copied.append(text)
+            started.set()
+            time.sleep(0.05)
+        pyperclip.copy = slow_copy
+
+        pyperclip.copy_async('first')
+        started.wait(1)
+        for i in range(100):
+            pyperclip.copy_async(i)
+        pyperclip.flush()
+        self.assertEqual(copied, ['first', 99])
+
+    def test_flush_raises_copy_error(self):
+        def failing_copy(text):
+            raise PyperclipException('no clipboard')
+        pyperclip.copy = failing_copy
+
+        pyperclip.copy_async('spam')
+        with self.assertRaises(PyperclipException):
+            pyperclip.flush()
+        pyperclip.flush()  # The error is only reported once.
+
+    def test_flush_timeout(self):
+        release = threading.Event()
+        pyperclip.copy = lambda text: release.wait(1)
+
+        pyperclip.copy_async('spam')
+        with self.assertRaises(pyperclip.PyperclipTimeoutException):
+            pyperclip.flush(timeout=0.01)
+        release.set()
+        pyperclip.flush()
+
+    def test_flush_at_exit_warns(self):
+        release = threading.Event()
+        pyperclip.copy = lambda text: release.wait(1)
+
+        pyperclip.copy_async('spam')
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            pyperclip._async_copier._flush_at_exit(timeout=0.01)
+        self.assertEqual(len(caught), 1)
+        release.set()
+        pyperclip.flush()
+
+
+class TestHistory(_TestFakeClipboard):
+    def test_attach_records_copy_and_paste(self):
+        history = pyperclip.History().attach()
+        try:
+            pyperclip.copy('spam')
+            pyperclip.copy('eggs')
+            self.assertEqual(pyperclip.paste(), 'eggs')
+        finally:
+            history.detach()
+        pyperclip.copy('bacon')
+        self.assertEqual(list(history), ['eggs', 'spam'])
+        self.assertNotIn('bacon', history)
+
+    def test_dedupe_moves_to_front(self):
+        history = pyperclip.History()
+        for text in ('a', 'b', 'a'):
+            history.add(text)
+        self.assertEqual(list(history), ['a', 'b'])
+        self.assertEqual(len(history), 2)
+
+    def test_eviction(self):
+        history = pyperclip.History(max_bytes=10)
+        for text in ('aaaa', 'bbbb', 'cccc'):
+            history.add(text)
+        self.assertEqual(list(history), ['cccc', 'bbbb'])
+        self.assertEqual(history.nbytes, 8)
+
+        history.add('x' * 11)  # Larger than the whole budget.
+        self.assertEqual(list(history), ['cccc', 'bbbb'])
+
+    def test_compression(self):
+        history = pyperclip.History(compress_threshold=100)
+        msg = u'ಠ_ಠ' * 1000
+        history.add(msg)
+        self.assertLess(history.nbytes, len(msg.encode('utf-8')))
+        self.assertIn(msg, history)
+        self.assertEqual(list(history), [msg])
+
+
+class TestOSC52(unittest.TestCase):
+    def setUp(self):
+        try:
+            self.master, self.slave = os.openpty()
+        except (AttributeError, OSError):
+            self.skipTest('Pseudo-terminals are not supported.')
+        self.copy, self.paste = init_osc52_clipboard(os.ttyname(self.slave), timeout=0.5)
+        self._saved_environ = os.environ.copy()
+        os.environ.pop('TMUX', None)
+        os.environ.pop('STY', None)
+
+    def tearDown(self):
+        os.environ.clear()
+        os.environ.update(self._saved_environ)
+        os.close(self.master)
+        os.close(self.slave)
+
+    def read_master(self, size):
+        data = b''
+        while len(data) < size:
+            data += os.read(self.master, size - len(data))
+        return data
+
+    def test_copy(self):
+        msg = u'ಠ_ಠ' * 10000
+        encoded = base64.b64encode(msg.encode('utf-8'))
+        expected = b'\x1b]52;c;' + encoded + b'\x07'
+        thread = threading.Thread(target=self.copy, args=(msg,))
+        thread.start()  # The pty buffer is smaller than the sequence.
+        self.assertEqual(self.read_master(len(expected)), expected)
+        thread.join()
+
+    def test_copy_tmux_passthrough(self):
+        os.environ['TMUX'] = '/tmp/tmux-0/default,1,0'
+        self.copy('hi', primary=True)
+        expected = b'\x1bPtmux;\x1b\x1b]52;p;aGk=\x07\x1b\\'
+        self.assertEqual(self.read_master(len(expected)), expected)
+
+    def test_copy_screen_chunks(self):
+        os.environ['STY'] = '1234.pts-0.host'
+        self.copy('x' * 200)
+        sequence = b'\x1b]52;c;' + base64.b64encode(b'x' * 200) + b'\x07'
+        chunks = [sequence[i:i + 76] for i in range(0, len(sequence), 76)]
+        expected = b''.join(b'\x1bP' + chunk + b'\x1b\\' for chunk in chunks)
+        self.assertEqual(self.read_master(len(expected)), expected)
+
+    def test_paste(self):
+        query = b'\x1b]52;c;?\x07'
+
+        def terminal():
+            self.read_master(len(query))
+            os.write(self.master, b'\x1b]52;c;' + base64.b64encode(u'ಠ_ಠ'.encode('utf-8')) + b'\x1b\\')
+        thread = threading.Thread(target=terminal)
+        thread.start()
+        self.assertEqual(self.paste(), u'ಠ_ಠ')
+        thread.join()
+
+    def test_paste_timeout(self):
+        with self.assertRaises(pyperclip.PyperclipTimeoutException):
+            self.paste()
+
+
+class TestTmux(TmuxTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super(TestTmux, cls).setUpClass()
+        cls.clipboard = init_tmux_clipboard()
+
+    def test_copy_paste(self):
+        copy, paste = self.clipboard
+        msg = u'pyper\nclip ಠ_ಠ' * 10000
+        copy(msg)
+        self.assertEqual(paste(), msg)
+        self.assertEqual(paste(max_bytes=5), (u'pyper', True))
+
+    def test_copy_fd(self):
+        copy, paste = self.clipboard
+        with tempfile.TemporaryFile() as fo:
+            fo.write(b'from a file')
+            fo.seek(0)
+            copy.copy_fd(fo.fileno())
+        self.assertEqual(paste(), u'from a file')
+
+
+class TestDevClipboardPath(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tempdir, 'clipboard')
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_regular_file(self):
+        copy, paste = init_dev_clipboard_clipboard(self.path, chunk_size=7)
+        msg = u'pyper\r\nclip ಠ_ಠ' * 100
+        copy(msg)
+        self.assertEqual(paste(), msg)
+        with open(self.path, 'rb') as fo:
+            self.assertEqual(fo.read(), msg.encode('utf-8'))  # No newline translation.
+
+        copy(u'short')  # Rewrites the reused file in place.
+        self.assertEqual(paste(), u'short')
+        self.assertEqual(paste(max_bytes=3), (u'sho', True))
+        copy(u'')
+        self.assertEqual(paste(), u'')
+
+    def test_paste_does_not_create_file(self):
+        copy, paste = init_dev_clipboard_clipboard(self.path)
+        self.assertEqual(paste(), u'')
+        self.assertEqual(paste(max_bytes=3), (u'', False))
+        self.assertFalse(os.path.exists(self.path))
+        copy(u'created')
+        self.assertEqual(paste(), u'created')
+
+    def test_fifo(self):
+        if not hasattr(os, 'mkfifo'):
+            self.skipTest('FIFOs are not supported.')
+        os.mkfifo(self.path)
+        copy, paste = init_dev_clipboard_clipboard(self.path)
+        received = []
+        reader = threading.Thread(target=lambda: received.append(open(self.path, 'rb').read()))
+        reader.start()
+        copy(u'ಠ_ಠ')
+        reader.join()
+        self.assertEqual(received, [u'ಠ_ಠ'.encode('utf-8')])
+
+        writer = threading.Thread(target=lambda: open(self.path, 'wb').write(b'from the fifo'))
+        writer.start()
+        self.assertEqual(paste(), u'from the fifo')
+        writer.join()
+
+
 class TestNoClipboard(unittest.TestCase):
     copy, paste = init_no_clipboard()
 
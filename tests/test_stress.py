@@ -0,0 +1,242 @@
+# coding: utf-8
+"""
+Concurrency stress and soak tests.
+
+Many threads (and processes) copy and paste at the same time, checking that
+pasted text is never corrupted or torn, and reporting p50/p99 latencies under
+contention. Set PYPERCLIP_SOAK_SECONDS to also run the long soak tests, which
+look for leaked child processes and file descriptors.
+
+Real clipboard mechanisms are tested when they're available (for example,
+xclip and xsel under Xvfb with $DISPLAY set), along with fake ones that don't
+need a display.
+"""
+import multiprocessing
+import os
+import random
+import sys
+import threading
+import time
+import unittest
+
+import pyperclip
+from pyperclip import (_executable_exists, init_xclip_clipboard, init_xsel_clipboard,
+                       init_wl_clipboard, init_tmux_clipboard)
+
+from clipboard_fixtures import fake_clipboard, FakeProgramsTestCase, TmuxTestCase
+
+THREADS = 8
+OPS_PER_THREAD = 25
+PROCESSES = 4
+SOAK_SECONDS = float(os.getenv('PYPERCLIP_SOAK_SECONDS', '0'))
+
+
+def _payload(worker, seq, size):
+    # A payload repeats its own header, so any torn or mixed-up paste can be
+    # detected by rebuilding the payload from its first two fields.
+    return (u'%d-%d-%d-ಠ_ಠ|' % (worker, seq, size)) * size
+
+
+def _is_intact(text):
+    if text == u'':
+        return True  # Nothing has been copied yet.
+    try:
+        worker, seq, size = (int(field) for field in text.split(u'-', 3)[:3])
+    except ValueError:
+        return False
+    return text == _payload(worker, seq, size)
+
+
+def _hammer(copy, paste, worker, ops, seed):
+    '''Copies and pastes ops times, returning (latencies, torn pastes).'''
+    rng = random.Random(seed)
+    latencies = []
+    torn = []
+    for seq in range(ops):
+        start = time.time()
+        if rng.random() < 0.5:
+            copy(_payload(worker, seq, rng.randint(1, 2000)))
+        else:
+            text = paste()
+            if not _is_intact(text):
+                torn.append(text[:80])
+        latencies.append(time.time() - start)
+    return latencies, torn
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def _open_fds():
+    try:
+        return set(os.listdir('/proc/self/fd'))
+    except OSError:
+        return None
+
+
+def _child_pids():
+    # Children that were never waited for (zombies) are still listed here.
+    pids = set()
+    try:
+        for tid in os.listdir('/proc/self/task'):
+            with open('/proc/self/task/%s/children' % tid) as fo:
+                pids.update(fo.read().split())
+    except (IOError, OSError):
+        return None
+    return pids
+
+
+def _process_worker(args):
+    name, worker = args
+    copy, paste = _CLIPBOARDS[name]()
+    return _hammer(copy, paste, worker, OPS_PER_THREAD, worker)
+
+
+_CLIPBOARDS = {
+    'fake': fake_clipboard,
+    'xclip': init_xclip_clipboard,
+    'xsel': init_xsel_clipboard,
+    'wl-clipboard': init_wl_clipboard,
+    'tmux': init_tmux_clipboard,
+}
+
+
+class _StressTest(unittest.TestCase):
+    clipboard_name = None
+    # Whether separate processes share the clipboard, which the in-process
+    # fake clipboard doesn't.
+    shared_between_processes = True
+
+    def setUp(self):
+        if self.clipboard_name is None:
+            self.skipTest('Clipboard not supported.')
+        self.copy, self.paste = _CLIPBOARDS[self.clipboard_name]()
+
+    def report(self, label, latencies):
+        sys.stderr.write('\n%s %s: %d ops, p50 %.2f ms, p99 %.2f ms\n' % (
+            self.clipboard_name, label, len(latencies),
+            _percentile(latencies, 0.50) * 1000, _percentile(latencies, 0.99) * 1000))
+
+    def run_threads(self, ops_per_thread):
+        results = [None] * THREADS
+        barrier = threading.Barrier(THREADS)
+
+        def run(worker):
+            barrier.wait()
+            results[worker] = _hammer(self.copy, self.paste, worker, ops_per_thread, worker)
+
+        threads = [threading.Thread(target=run, args=(worker,)) for worker in range(THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        latencies = [latency for result in results for latency in result[0]]
+        torn = [text for result in results for text in result[1]]
+        return latencies, torn
+
+    def test_threads(self):
+        latencies, torn = self.run_threads(OPS_PER_THREAD)
+        self.assertEqual(torn, [])
+        self.report('threads', latencies)
+
+    def test_processes(self):
+        if not self.shared_between_processes or not hasattr(os, 'fork'):
+            self.skipTest('Processes do not share this clipboard.')
+        pool = multiprocessing.get_context('fork').Pool(PROCESSES)
+        try:
+            results = pool.map(_process_worker, [(self.clipboard_name, worker) for worker in range(PROCESSES)])
+        finally:
+            pool.close()
+            pool.join()
+        self.assertEqual([text for result in results for text in result[1]], [])
+        self.report('processes', [latency for result in results for latency in result[0]])
+
+    def test_no_leaks(self):
+        fds_before, children_before = _open_fds(), _child_pids()
+        if fds_before is None or children_before is None:
+            self.skipTest('/proc is not available.')
+        ops = OPS_PER_THREAD
+        deadline = time.time() + SOAK_SECONDS
+        while True:
+            latencies, torn = self.run_threads(ops)
+            self.assertEqual(torn, [])
+            if time.time() >= deadline:
+                break
+            ops = OPS_PER_THREAD * 4  # Soak in bigger rounds.
+        self.assertEqual(_child_pids() - children_before, set())
+        self.assertEqual(_open_fds() - fds_before, set())
+
+
+class TestLazyLoadRace(unittest.TestCase):
+    def setUp(self):
+        self._saved = pyperclip.copy, pyperclip.paste, pyperclip.determine_clipboard
+
+    def tearDown(self):
+        pyperclip.copy, pyperclip.paste, pyperclip.determine_clipboard = self._saved
+
+    def test_first_calls_from_many_threads(self):
+        for attempt in range(20):
+            pyperclip.copy, pyperclip.paste = pyperclip.lazy_load_stub_copy, pyperclip.lazy_load_stub_paste
+            determined = []
+
+            def determine_clipboard():
+                determined.append(None)
+                time.sleep(0.001)  # Widens the window for a race.
+                return fake_clipboard()
+            pyperclip.determine_clipboard = determine_clipboard
+
+            barrier = threading.Barrier(THREADS)
+            errors = []
+
+            def run(worker):
+                barrier.wait()
+                try:
+                    if worker % 2:
+                        pyperclip.copy(_payload(worker, 0, 10))
+                    elif not _is_intact(pyperclip.paste()):
+                        errors.append(worker)
+                except Exception as exc:
+                    errors.append(exc)
+
+            threads = [threading.Thread(target=run, args=(worker,)) for worker in range(THREADS)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(errors, [])
+            self.assertEqual(len(determined), 1)
+
+
+class TestFakeClipboard(_StressTest):
+    clipboard_name = 'fake'
+    shared_between_processes = False
+
+
+class TestFakeXclipProgram(FakeProgramsTestCase, _StressTest):
+    clipboard_name = 'xclip'
+    programs = ('xclip',)
+
+
+class TestXClip(_StressTest):
+    if os.getenv('DISPLAY') and _executable_exists('xclip'):
+        clipboard_name = 'xclip'
+
+
+class TestXSel(_StressTest):
+    if os.getenv('DISPLAY') and _executable_exists('xsel'):
+        clipboard_name = 'xsel'
+
+
+class TestWlClipboard(_StressTest):
+    if os.getenv('WAYLAND_DISPLAY') and _executable_exists('wl-copy'):
+        clipboard_name = 'wl-clipboard'
+
+
+class TestTmux(TmuxTestCase, _StressTest):
+    clipboard_name = 'tmux'
+
+
+if __name__ == '__main__':
+    unittest.main()